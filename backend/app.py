@@ -1,39 +1,133 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, send_file, url_for
 from flask_restful import Api, Resource
 from flask_cors import CORS
-from pymongo import MongoClient
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
-import bcrypt
+from pymongo import MongoClient, ASCENDING, InsertOne, UpdateOne, DeleteOne, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity, get_jwt
 import logging
+from logging.handlers import QueueHandler, QueueListener
 import os
+import queue
 from bson import ObjectId
 from functools import wraps
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import csv
+import io
+import json
+import tempfile
+import threading
+import time
+
+import events
+import http_cache
+import indexes
+import instrumentation
+import jobs
+import search
+import stats
+import validation
+from profile_pictures import PROFILE_PICTURE_MAX_AGE, UPLOAD_FOLDER, picture_extension, picture_path, save_profile_picture
+from passwords import HasherBusy, LOGIN_ATTEMPT_WINDOW, email_throttle, ip_throttle, password_hasher
+from validation import (AUDIT_FIELDS, DEFAULT_PAGE_SIZE, INTERN_FIELDS, OWNER_STATS_FIELDS, PROJECT_FIELDS,
+                        PROJECT_REQUIRED_FIELDS, PROJECT_STATS_FIELDS, TASK_FIELDS, TASK_MOVE_FIELDS,
+                        TASK_REQUIRED_FIELDS, TASK_UPDATE_FIELDS, USER_PROFILE_FIELDS, build_project, build_task, build_user)
 
 app = Flask(__name__)
 api = Api(app)
 CORS(app)  # Enable CORS for all origins
+instrumentation.init_app(app)
+http_cache.init_app(app)
 
 # Setup logging
-logging.basicConfig(level=logging.DEBUG)
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+_log_listener = None
 
-# Dosya yükleme için klasör oluşturma 
-UPLOAD_FOLDER = 'uploads'
-DEFAULT_PROFILE_PICTURE = 'uploads/default-profile.png'  # Varsayılan profil fotoğrafı yolu
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
 
+def configure_logging(level=None):
+    """Kayıtlar kuyruğa yazılır, ayrı bir thread stderr'e aktarır; istek thread'i I/O beklemez."""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+
+    log_queue = queue.Queue(-1)
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s [%(process)d] %(name)s: %(message)s'))
+    _log_listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _log_listener.start()
+
+    root = logging.getLogger()
+    root.handlers = [QueueHandler(log_queue)]
+    root.setLevel(level or LOG_LEVEL)
+
+# Dosya yükleme klasörü; profil fotoğrafları profile_pictures.py'de, belge içinde değil diskte tutulur
+DEFAULT_PROFILE_PICTURE = 'uploads/default-profile.png'  # Varsayılan profil fotoğrafı yolu
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
 # MongoDB connection
-try:
-    client = MongoClient("mongodb://localhost:27017/")
-    db = client.intern_management
-    logging.info("Connected to MongoDB successfully")
-except Exception as e:
-    logging.error(f"Failed to connect to MongoDB: {e}")
+MONGO_URI = os.environ.get('MONGO_URI', "mongodb://localhost:27017/")
+MONGO_DB_NAME = os.environ.get('MONGO_DB_NAME', 'intern_management')
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', 100))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', 5000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', 30000))
+MONGO_READ_PREFERENCE = os.environ.get('MONGO_READ_PREFERENCE', 'primary')  # primary, primaryPreferred, secondaryPreferred...
+
+client = None
+db = None
+
+
+def init_db():
+    """Mongo istemcisini kurar.
+
+    connect=False ile soket açılmaz; gunicorn her worker'da fork sonrasında
+    bu fonksiyonu yeniden çağırır, böylece worker'lar bağlantı havuzu paylaşmaz.
+    """
+    global client, db
+    try:
+        client = MongoClient(
+            MONGO_URI,
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+            serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+            readPreference=MONGO_READ_PREFERENCE,
+            event_listeners=[instrumentation.command_monitor],
+            connect=False
+        )
+        instrumentation.command_monitor.client = client
+        db = client[MONGO_DB_NAME]
+        logging.info("MongoDB client configured")
+    except Exception as e:
+        logging.error(f"Failed to configure MongoDB client: {e}")
+    return db
+
+
+init_db()
+
+# Okuma uç noktalarının ETag'leri bu sayaçlardan türetilir; yazma kaynakları ilgili koleksiyonu artırır
+revisions = http_cache.RevisionTracker(lambda: db)
+
+# Denetim kaydı ve bildirimler arka planda işlenir; 0 verilirse yalnızca `python jobs.py worker` işler
+JOBS_WORKER_THREADS = int(os.environ.get('JOBS_WORKER_THREADS', 1))
+job_queue = jobs.JobQueue(lambda: db)
+
+
+def publish_changes(changes):
+    """Değişiklik olaylarını SSE abonelerine yayınlar, audit/notify işlerini tek insert'le kuyruğa atar."""
+    actor = get_jwt_identity()
+    queued = []
+    for event in changes:
+        events.broker.publish(event)
+        queued.extend(jobs.jobs_for_event(event, actor))
+    job_queue.enqueue_many(queued)
+
 
 # JWT Configuration
-app.config['JWT_SECRET_KEY'] = 'your_jwt_secret_key'
+app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'your_jwt_secret_key')
+app.config['JWT_QUERY_STRING_NAME'] = 'token'  # EventSource başlık gönderemediği için /events token'ı sorgu dizesinden alır
+# Flask-RESTful yakalanmamış hataları 500'e çevirir; token hataları JWTManager'ın 401/422 yanıtlarına ulaşsın
+app.config['PROPAGATE_EXCEPTIONS'] = True
 jwt = JWTManager(app)
 
 # Define status constants
@@ -44,12 +138,98 @@ STATUS_YAPILDI = "yapildi"
 STATUS_TAKEN = "taken"
 
 
+def ensure_indexes():
+    # Tanımlar indexes.INDEXES'te; oluşturulamayanlar loglanır ve döndürülür
+    return indexes.ensure(db)
+
+
+# Sayfalama ve doğrulama validation.py'de; ASGI sürümü de aynı fonksiyonları kullanır
+def parse_page_args(allowed_fields, id_type=str, default_fields=None):
+    return validation.parse_page_args(request.args, allowed_fields, id_type, default_fields)
+
+
+def find_page(collection, query, projection, limit, after):
+    """_id üzerinden keyset sayfalama yapar, (belgeler, next_cursor) döner."""
+    query, projection, drop_id = validation.page_query(query, projection, after)
+    docs = list(collection.find(query, projection).sort("_id", ASCENDING).limit(limit + 1))
+    return validation.page_result(docs, limit, drop_id)
+
+
+def task_filters():
+    return validation.task_filters(request.args)
+
+
+def profile_picture_url(user):
+    if not user.get("profile_picture"):
+        return None
+    return url_for('profilepicture', user_id=str(user["_id"]), v=user.get("profile_picture_version", 0), _external=True)
+
+
+class UserSummaryCache:
+    """email -> {role, name, surname} özetleri için süreli (TTL) ve boyut sınırlı LRU önbellek."""
+
+    def __init__(self, maxsize=10000, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, email):
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(email)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self._entries[email]
+            self.misses += 1
+            return None
+
+    def set(self, email, summary):
+        with self._lock:
+            self._entries[email] = (time.monotonic() + self.ttl, summary)
+            self._entries.move_to_end(email)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, email):
+        with self._lock:
+            self._entries.pop(email, None)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries),
+                    "maxsize": self.maxsize, "ttl": self.ttl}
+
+
+user_cache = UserSummaryCache()
+
+
+def get_user_summary(email):
+    summary = user_cache.get(email)
+    if summary is None:
+        summary = db.users.find_one({"email": email}, {"_id": 0, "role": 1, "name": 1, "surname": 1})
+        if summary:
+            user_cache.set(email, summary)
+    return summary
+
+
+def current_user_role():
+    # Rol giriş sırasında token'a yazılır; eski token'lar için önbellekli kullanıcı özetine düşülür
+    role = get_jwt().get("role")
+    if role:
+        return role
+    summary = get_user_summary(get_jwt_identity())
+    return summary.get("role") if summary else None
+
+
 def admin_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        current_user_email = get_jwt_identity()
-        user = db.users.find_one({"email": current_user_email})
-        if user and user.get("role") == "admin":
+        if current_user_role() == "admin":
             return fn(*args, **kwargs)
         else:
             return {"message": "Admin access required"}, 403
@@ -62,45 +242,37 @@ class UserRegistration(Resource):
         if not data:
             return {"message": "No input data provided"}, 400
 
-        email = data.get('email')
+        user, error = build_user(data)
+        if error:
+            return {"message": error}, 400
+        email = user["email"]
         password = data.get('password')
-        name = data.get('name')
-        surname = data.get('surname')
-        phone = data.get('phone')
-        school = data.get('school')
-        department = data.get('department')
-        role = data.get('role')
-
-        if not email or not password or not name or not surname or not role:
-            return {"message": "Email, password, name, surname, and role are required"}, 400
 
-        if role not in ['admin', 'intern']:
-            return {"message": "Role must be either 'admin' or 'intern'"}, 400
+        # Pahalı hash'ten önce kontrol edilir; eşzamanlı kayıtları benzersiz indeks yakalar
+        if db.users.find_one({"email": email}, {"_id": 1}):
+            return {"message": "User already exists"}, 409
 
         # Hash the password
         try:
-            hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+            hashed_password = password_hasher.hash(password)
             logging.info(f"Password hashed successfully for user: {email}")
+        except HasherBusy:
+            return {"message": "Server is busy, please try again"}, 503, {"Retry-After": "1"}
         except Exception as e:
             logging.error(f"Password hashing failed: {e}")
             return {"message": "Password hashing failed"}, 500
 
         # Insert user data into MongoDB
         try:
-            db.users.insert_one({
-                "email": email, 
-                "password": hashed_password, 
-                "name": name, 
-                "surname": surname, 
-                "phone": phone, 
-                "school": school, 
-                "department": department,
-                "role": role,
-                "profile_picture": None,  # Initialize profile_picture as None
-                "tasks": []  # Initialize tasks as an empty list
-            })
+            user["password"] = hashed_password
+            db.users.insert_one(user)
+            user_cache.invalidate(email)
+            search.index(db, 'user', [user])
+            revisions.bump('users')
             logging.info(f"User {email} registered successfully")
             return {"message": "User registered successfully"}, 201
+        except DuplicateKeyError:
+            return {"message": "User already exists"}, 409
         except Exception as e:
             logging.error(f"User registration failed: {e}")
             return {"message": str(e)}, 500
@@ -117,13 +289,30 @@ class UserLogin(Resource):
         if not email or not password:
             return {"message": "Email and password are required"}, 400
 
+        if ip_throttle.blocked(db.login_attempts, request.remote_addr) or not email_throttle.hit(db.login_attempts, email):
+            return {"message": "Too many login attempts, please try again later"}, 429, {"Retry-After": str(LOGIN_ATTEMPT_WINDOW)}
+
         # Query MongoDB to find user with matching email
         user = db.users.find_one({"email": email})
 
-        if user and bcrypt.checkpw(password.encode('utf-8'), user['password']):
-            access_token = create_access_token(identity=email)
+        try:
+            valid = bool(user) and password_hasher.verify(password, user['password'])
+        except HasherBusy:
+            return {"message": "Server is busy, please try again"}, 503, {"Retry-After": "1"}
+
+        if valid:
+            email_throttle.reset(db.login_attempts, email)
+            if password_hasher.needs_rehash(user['password']):
+                try:
+                    db.users.update_one({"_id": user["_id"]}, {"$set": {"password": password_hasher.hash(password)}})
+                except Exception as e:
+                    # Yeniden hash başarısız olsa da giriş engellenmez
+                    logging.warning(f"Password rehash failed for {email}: {e}")
+            access_token = create_access_token(identity=email, additional_claims={"role": user.get("role")})
+            user_cache.set(email, {"role": user.get("role"), "name": user.get("name"), "surname": user.get("surname")})
             return {"message": "Login successful", "access_token": access_token}, 200
         else:
+            ip_throttle.record(db.login_attempts, request.remote_addr)
             return {"message": "Invalid credentials"}, 401
 
 class ProtectedResource(Resource):
@@ -135,27 +324,35 @@ class ProtectedResource(Resource):
 class UserProfileUpdate(Resource):
     @jwt_required()
     def put(self):
-        data = request.form.to_dict()
         current_user_email = get_jwt_identity()
-
-        update_fields = {
-            "name": data.get('name'),
-            "surname": data.get('surname'),
-            "phone": data.get('phone'),
-            "school": data.get('school'),
-            "department": data.get('department'),
-            "gender": data.get('gender'),
-            "birthdate": data.get('birthdate'),
-        }
+        update_fields = validation.profile_update_fields(request.form)
 
         if 'profile_picture' in request.files:
             profile_picture_file = request.files['profile_picture']
-            profile_picture_binary = profile_picture_file.read()  # Read file as binary
-            update_fields["profile_picture"] = profile_picture_binary
+            extension = picture_extension(profile_picture_file.filename)
+            if extension is None:
+                return {"message": "Unsupported profile picture type"}, 400
+
+            user = db.users.find_one({"email": current_user_email}, {"_id": 1})
+            if not user:
+                return {"message": "User not found"}, 404
+            try:
+                update_fields["profile_picture"] = save_profile_picture(user["_id"], profile_picture_file, extension)
+                update_fields["profile_picture_version"] = int(time.time())
+            except ValueError as e:
+                return {"message": str(e)}, 400
+            except Exception as e:
+                logging.error(f"Saving profile picture failed: {e}")
+                return {"message": "Saving profile picture failed"}, 500
 
         try:
-            result = db.users.update_one({"email": current_user_email}, {"$set": update_fields})
-            if result.matched_count == 1:
+            # Arama kaydı rol gibi formda olmayan alanları da içerdiği için güncel belgeden kurulur
+            user = db.users.find_one_and_update({"email": current_user_email}, {"$set": update_fields},
+                                                search.source_projection('user'), return_document=ReturnDocument.AFTER)
+            user_cache.invalidate(current_user_email)
+            if user:
+                search.index(db, 'user', [user])
+                revisions.bump('users')
                 return {"message": "Profile updated successfully"}, 200
             else:
                 return {"message": "User not found"}, 404
@@ -163,36 +360,85 @@ class UserProfileUpdate(Resource):
             return {"message": str(e)}, 500
 
 
+def load_profile(email):
+    user = db.users.find_one({"email": email}, {"password": 0})
+    if not user:
+        return None
+
+    picture = user.get("profile_picture")
+    if isinstance(picture, bytes):
+        # Eski kayıtlarda fotoğraf belgenin içinde; ilk okumada gerçek biçimiyle diske taşı
+        try:
+            path = save_profile_picture(user["_id"], picture, "jpg")
+        except ValueError:
+            logging.warning(f"Legacy profile picture of {email} is not a readable image")
+            user["profile_picture"] = None
+            return user
+        user["profile_picture"] = path
+        user["profile_picture_version"] = int(time.time())
+        db.users.update_one({"_id": user["_id"]}, {"$set": {
+            "profile_picture": path,
+            "profile_picture_version": user["profile_picture_version"]
+        }})
+        revisions.bump('users')
+    return user
+
+
+def profile_response(user):
+    user["profile_picture"] = profile_picture_url(user)
+    user.pop("profile_picture_version", None)
+    del user["_id"]
+    return user
+
+
 class UserProfile(Resource):
     @jwt_required()
     def get(self):
         current_user_email = get_jwt_identity()
-        user = db.users.find_one({"email": current_user_email}, {"_id": 0, "password": 0})
+        user = load_profile(current_user_email)
 
         if user:
-            if user.get("profile_picture"):
-                user["profile_picture"] = user["profile_picture"].decode('latin1')
-            return jsonify(user)
+            return jsonify(profile_response(user))
         else:
             return {"message": "User not found"}, 404
 
+class ProfilePicture(Resource):
+    # <img> etiketleri Authorization başlığı gönderemediği için bu uç nokta herkese açık
+    def get(self, user_id):
+        if not ObjectId.is_valid(user_id):
+            return {"message": "User not found"}, 404
+
+        user = db.users.find_one({"_id": ObjectId(user_id)}, {"profile_picture": 1, "profile_picture_version": 1})
+        if not user or not isinstance(user.get("profile_picture"), str):
+            return {"message": "Profile picture not found"}, 404
+
+        path = picture_path(user_id, user["profile_picture"], request.args.get('size'))
+        if path is None:
+            return {"message": "Profile picture not found"}, 404
+
+        # send_file ETag, Last-Modified, Range ve 304 yanıtlarını kendisi yönetir
+        return send_file(path, conditional=True, etag=True, max_age=PROFILE_PICTURE_MAX_AGE)
+
 class UserTasks(Resource):
     @jwt_required()
     def get(self):
         current_user_email = get_jwt_identity()
-        user = db.users.find_one({"email": current_user_email}, {"tasks": 1, "name": 1, "surname": 1, "role": 1})
-        role = user.get('role')
-        
-        if user:
+        role = current_user_role()
+
+        if role:
+            try:
+                limit, after, projection = parse_page_args(TASK_FIELDS)
+            except ValueError as e:
+                return {"message": str(e)}, 400
+
+            query = task_filters()
             if role == 'intern':
-                tasks = user['tasks']
-                return jsonify(tasks)
-            elif role == 'admin':
-                tasks = list(db.users.find({}, {"tasks": 1, "_id": 0}))
-                tasks = [task for user_tasks in tasks for task in user_tasks.get('tasks', [])]
-                return jsonify(tasks)
-            else:
+                query["owner"] = current_user_email
+            elif role != 'admin':
                 return {"message": "Unknown role"}, 400
+
+            tasks, next_cursor = find_page(db.tasks, query, projection, limit, after)
+            return jsonify({"items": tasks, "next_cursor": next_cursor})
         else:
             return {"message": "User not found"}, 404
 
@@ -202,30 +448,20 @@ class AddTask(Resource):
     def post(self):
         try:
             data = request.get_json()
-            app.logger.debug(f"Received data: {data}")
+            app.logger.debug("Received data: %s", data)
 
             if not data:
                 return {"message": "No input data provided"}, 400
 
-            task_header = data.get('header')
-            task_details = data.get('details')
-            task_status = data.get('status')
-            project_id = data.get('project_id')
-            owner = data.get('owner')  # Yeni alan
-
-            if not task_header or not task_details or not task_status or not project_id or not owner:
-                return {"message": "Header, details, status, project_id, and owner are required"}, 400
-
-            task = {
-                "_id": str(ObjectId()),  # Generate a new ObjectId
-                "header": task_header,
-                "details": task_details,
-                "status": task_status,
-                "owner": owner,  # Görevi atanan intern
-                "project_id": project_id
-            }
-
-            db.users.update_one({"email": owner}, {"$push": {"tasks": task}})
+            task, error = build_task(data)
+            if error:
+                return {"message": error}, 400
+
+            db.tasks.insert_one(task)
+            stats.record(db, [(None, task)])
+            search.index(db, 'task', [task])
+            revisions.bump('tasks')
+            publish_changes([events.make_event('task', 'created', task["_id"], task)])
             return {"message": "Task added successfully", "task_id": task["_id"]}, 201
         except Exception as e:
             app.logger.error(f"Error adding task: {e}")
@@ -236,7 +472,7 @@ class UpdateTaskStatus(Resource):
     def put(self):
         try:
             data = request.get_json()
-            app.logger.debug(f"Received data for update: {data}")
+            app.logger.debug("Received data for update: %s", data)
 
             task_id = data.get('task_id')
             new_status = data.get('status')
@@ -244,12 +480,17 @@ class UpdateTaskStatus(Resource):
             if not task_id or not new_status:
                 return {"message": "Task ID and new status are required"}, 400
 
-            result = db.users.update_one(
-                {"tasks._id": task_id},
-                {"$set": {"tasks.$.status": new_status}}
+            # Durum zaten aynıysa belge bulunmaz; önceki modified_count davranışıyla aynı
+            previous = db.tasks.find_one_and_update(
+                {"_id": task_id, "status": {"$ne": new_status}},
+                {"$set": {"status": new_status}}
             )
 
-            if result.modified_count == 1:
+            if previous:
+                task = dict(previous, status=new_status)
+                stats.record(db, [(previous, task)])
+                revisions.bump('tasks')
+                publish_changes([events.make_event('task', 'updated', task_id, task)])
                 return {"message": "Task status updated successfully"}, 200
             else:
                 return {"message": "Task not found or no changes made"}, 404
@@ -257,24 +498,402 @@ class UpdateTaskStatus(Resource):
             app.logger.error(f"Error updating task status: {e}")
             return {"message": str(e)}, 500
 
+BULK_MAX_OPERATIONS = int(os.environ.get('BULK_MAX_OPERATIONS', 1000))
+BULK_TRANSACTIONS = os.environ.get('BULK_TRANSACTIONS', 'auto')  # auto, always, never
+
+
+def run_bulk_write(operations, ordered):
+    """bulk_write'ı destekleniyorsa transaction içinde çalıştırır; (sonuç, transaction_kullanıldı) döner."""
+    if BULK_TRANSACTIONS != 'never':
+        try:
+            with client.start_session() as session:
+                try:
+                    with session.start_transaction():
+                        return db.tasks.bulk_write(operations, ordered=ordered, session=session), True
+                except BulkWriteError as e:
+                    e.rolled_back = True
+                    raise
+        except OperationFailure as e:
+            # Tek sunuculu kurulumlarda transaction yok (IllegalOperation, kod 20)
+            if BULK_TRANSACTIONS == 'always' or e.code != 20:
+                raise
+        except NotImplementedError:
+            if BULK_TRANSACTIONS == 'always':
+                raise
+    return db.tasks.bulk_write(operations, ordered=ordered), False
+
+
+def index_task_changes(changes):
+    """Toplu yazmadaki (önceki, sonraki) çiftlerini arama indeksine uygular."""
+    search.index(db, 'task', [after for before, after in changes if after is not None])
+    search.remove(db, 'task', [before["_id"] for before, after in changes if after is None])
+
+
+class BulkTasks(Resource):
+    @jwt_required()
+    @admin_required
+    def post(self):
+        data = request.get_json()
+        if not data:
+            return {"message": "No input data provided"}, 400
+        if not isinstance(data, dict):
+            return {"message": "Request body must be a JSON object"}, 400
+
+        items = data.get('operations')
+        ordered = data.get('ordered', True)
+        if not isinstance(items, list) or not items:
+            return {"message": "operations must be a non-empty list"}, 400
+        if not isinstance(ordered, bool):
+            return {"message": "ordered must be a boolean"}, 400
+        if len(items) > BULK_MAX_OPERATIONS:
+            return {"message": f"At most {BULK_MAX_OPERATIONS} operations are allowed"}, 400
+
+        # Güncellenen/silinen görevler tek sorguda okunur: var olmayanlar raporlanır, olaylar için önceki hal bilinir
+        referenced = [item['task_id'] for item in items if isinstance(item, dict) and isinstance(item.get('task_id'), str)]
+        try:
+            existing = {task["_id"]: task for task in db.tasks.find({"_id": {"$in": referenced}})} if referenced else {}
+        except Exception as e:
+            return {"message": str(e)}, 500
+
+        results = []
+        operations = []
+        changes = []  # İşlem başına (önceki, sonraki) görev; istatistikler için
+        pending_events = []
+        for index, item in enumerate(items):
+            op = item.get('op') if isinstance(item, dict) else None
+            task_id = item.get('task_id') if isinstance(item, dict) else None
+            if not isinstance(task_id, str):
+                task_id = None
+
+            if op == 'create':
+                task_data = item.get('task') or {}
+                if not isinstance(task_data, dict):
+                    results.append({"index": index, "op": op, "status": "invalid", "message": "task must be an object"})
+                    continue
+                task, error = build_task(task_data)
+                if error:
+                    results.append({"index": index, "op": op, "status": "invalid", "message": error})
+                    continue
+                operations.append(InsertOne(task))
+                changes.append((None, task))
+                pending_events.append(events.make_event('task', 'created', task["_id"], task))
+                results.append({"index": index, "op": op, "status": "ok", "task_id": task["_id"]})
+            elif op in ('update', 'move'):
+                allowed = TASK_UPDATE_FIELDS if op == 'update' else TASK_MOVE_FIELDS
+                fields = item.get('fields') or {}
+                if not isinstance(fields, dict):
+                    results.append({"index": index, "op": op, "status": "invalid", "message": "fields must be an object"})
+                    continue
+                fields = {key: value for key, value in fields.items() if key in allowed}
+                if not task_id or not fields:
+                    results.append({"index": index, "op": op, "status": "invalid",
+                                    "message": f"task_id and at least one of {', '.join(allowed)} are required"})
+                    continue
+                if task_id not in existing:
+                    results.append({"index": index, "op": op, "status": "not_found", "task_id": task_id})
+                    continue
+                previous = existing[task_id]
+                operations.append(UpdateOne({"_id": task_id}, {"$set": fields}))
+                existing[task_id] = dict(previous, **fields)
+                changes.append((previous, existing[task_id]))
+                pending_events.append(events.make_event('task', 'updated', task_id, existing[task_id],
+                                                        previous_owner=previous.get("owner")))
+                results.append({"index": index, "op": op, "status": "ok", "task_id": task_id})
+            elif op == 'delete':
+                if not task_id:
+                    results.append({"index": index, "op": op, "status": "invalid", "message": "task_id is required"})
+                    continue
+                if task_id not in existing:
+                    results.append({"index": index, "op": op, "status": "not_found", "task_id": task_id})
+                    continue
+                operations.append(DeleteOne({"_id": task_id}))
+                changes.append((existing[task_id], None))
+                pending_events.append(events.make_event('task', 'deleted', task_id, existing.pop(task_id)))
+                results.append({"index": index, "op": op, "status": "ok", "task_id": task_id})
+            else:
+                results.append({"index": index, "op": op, "status": "invalid",
+                                "message": "op must be one of create, update, move, delete"})
+
+        # Hatalı öğe varsa hiçbir şey yazılmaz
+        if any(result["status"] != "ok" for result in results):
+            return {"message": "Some operations are invalid, nothing was written", "results": results}, 400
+
+        try:
+            result, transactional = run_bulk_write(operations, ordered)
+        except BulkWriteError as e:
+            # Tüm öğeler geçerli olduğu için işlem sırası sonuç sırasıyla aynı
+            failed = {error["index"]: error.get("errmsg") for error in e.details.get("writeErrors", [])}
+            rolled_back = getattr(e, 'rolled_back', False)
+            if not rolled_back:
+                # Sıralı yazmada ilk hatadan sonrası hiç denenmez
+                stop = min(failed) if ordered and failed else len(changes)
+                applied = [position for position in range(stop) if position not in failed]
+                stats.record(db, [changes[position] for position in applied])
+                index_task_changes([changes[position] for position in applied])
+                revisions.bump('tasks')
+                publish_changes([pending_events[position] for position in applied])
+            for position, item_result in enumerate(results):
+                if position in failed:
+                    item_result.update(status="error", message=failed[position])
+                elif rolled_back:
+                    item_result["status"] = "rolled_back"
+                elif ordered and failed and position > min(failed):
+                    item_result["status"] = "skipped"
+            message = "Bulk write failed, transaction rolled back" if rolled_back else "Bulk write partially failed"
+            return {"message": message, "results": results}, 500
+        except Exception as e:
+            return {"message": str(e)}, 500
+
+        stats.record(db, changes)
+        index_task_changes(changes)
+        revisions.bump('tasks')
+        publish_changes(pending_events)
+
+        return {
+            "message": "Bulk operations applied successfully",
+            "transactional": transactional,
+            "inserted": result.inserted_count,
+            "modified": result.modified_count,
+            "deleted": result.deleted_count,
+            "results": results
+        }, 200
+
+
+# İçe/dışa aktarma ayarları
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 500))
+IMPORT_MAX_ERRORS = 100  # İş kaydında saklanan en fazla hata sayısı
+EXPORT_FIELDS = {
+    "users": USER_PROFILE_FIELDS,
+    "projects": ["_id"] + PROJECT_REQUIRED_FIELDS,
+    "tasks": ["_id"] + TASK_REQUIRED_FIELDS,
+}
+import_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="import")
+
+
+def read_rows(path, data_format):
+    """Dosyayı satır satır okur; (satır no, kayıt veya None, hata) üretir."""
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        if data_format == 'csv':
+            for line_number, row in enumerate(csv.DictReader(f), start=2):
+                yield line_number, {key: value for key, value in row.items() if value not in (None, '')}, None
+        else:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield line_number, None, f"Invalid JSON: {e}"
+                    continue
+                if not isinstance(row, dict):
+                    yield line_number, None, "Each line must be a JSON object"
+                    continue
+                yield line_number, row, None
+
+
+def insert_import_batch(kind, batch):
+    """Bir grup doğrulanmış kaydı yazar; (eklenen, hatalar) döner."""
+    errors = []
+    if kind == 'users':
+        # Dosyada ve veritabanında tekrar eden e-postalar atlanır
+        emails = [user["email"] for _, user, _ in batch]
+        taken = {user["email"] for user in db.users.find({"email": {"$in": emails}}, {"email": 1})}
+        unique = []
+        for line_number, user, password in batch:
+            if user["email"] in taken:
+                errors.append({"line": line_number, "message": f"Email already exists: {user['email']}"})
+                continue
+            taken.add(user["email"])
+            unique.append((user, password))
+        for (user, _), hashed in zip(unique, password_hasher.hash_many([password for _, password in unique])):
+            user["password"] = hashed
+        documents = [user for user, _ in unique]
+    else:
+        documents = [document for _, document, _ in batch]
+
+    if not documents:
+        return 0, errors
+    failed = set()
+    try:
+        result = db[kind].insert_many(documents, ordered=False)
+        inserted = len(result.inserted_ids)
+    except BulkWriteError as e:
+        inserted = e.details.get("nInserted", 0)
+        failed = {error["index"] for error in e.details.get("writeErrors", [])}
+        errors.extend({"line": None, "message": error.get("errmsg")} for error in e.details.get("writeErrors", []))
+    inserted_documents = [document for position, document in enumerate(documents) if position not in failed]
+    if kind == 'tasks':
+        stats.record(db, [(None, task) for task in inserted_documents])
+    search.index(db, kind[:-1], inserted_documents)
+    if kind == 'users':
+        for document in documents:
+            user_cache.invalidate(document["email"])
+    revisions.bump(kind)
+    return inserted, errors
+
+
+def run_import(job_id, kind, data_format, path):
+    counters = {"processed": 0, "inserted": 0, "failed": 0}
+    errors = []
+
+    def record(new_errors):
+        counters["failed"] += len(new_errors)
+        errors.extend(new_errors[:max(0, IMPORT_MAX_ERRORS - len(errors))])
+
+    def flush(batch):
+        inserted, batch_errors = insert_import_batch(kind, batch)
+        counters["inserted"] += inserted
+        record(batch_errors)
+        db.import_jobs.update_one({"_id": job_id}, {"$set": dict(counters, errors=errors)})
+
+    try:
+        db.import_jobs.update_one({"_id": job_id}, {"$set": {"state": "running"}})
+        batch = []
+        for line_number, row, error in read_rows(path, data_format):
+            counters["processed"] += 1
+            if error is None:
+                if kind == 'users':
+                    document, error = build_user(row)
+                elif kind == 'projects':
+                    document, error = build_project(row)
+                else:
+                    document, error = build_task(row)
+            if error:
+                record([{"line": line_number, "message": error}])
+                continue
+            batch.append((line_number, document, row.get('password')))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+        db.import_jobs.update_one({"_id": job_id}, {"$set": dict(
+            counters, errors=errors, state="done", finished_at=time.time())})
+    except Exception as e:
+        logging.error(f"Import job {job_id} failed: {e}")
+        db.import_jobs.update_one({"_id": job_id}, {"$set": dict(
+            counters, errors=errors, state="failed", message=str(e), finished_at=time.time())})
+    finally:
+        os.remove(path)
+
+
+class AdminImport(Resource):
+    @jwt_required()
+    @admin_required
+    def post(self):
+        kind = request.args.get('type')
+        if kind not in EXPORT_FIELDS:
+            return {"message": "type must be one of users, projects, tasks"}, 400
+
+        upload = request.files.get('file')
+        filename = upload.filename if upload else ''
+        data_format = request.args.get('format') or ('csv' if filename.lower().endswith('.csv') else 'ndjson')
+        if data_format not in ('csv', 'ndjson'):
+            return {"message": "format must be csv or ndjson"}, 400
+
+        # Yükleme parça parça geçici dosyaya yazılır; iş arka planda satır satır işler
+        fd, path = tempfile.mkstemp(prefix='import-', suffix='.' + data_format)
+        with os.fdopen(fd, 'wb') as f:
+            source = upload.stream if upload else request.stream
+            while True:
+                chunk = source.read(64 * 1024)
+                if not chunk:
+                    break
+                f.write(chunk)
+
+        job_id = str(ObjectId())
+        db.import_jobs.insert_one({
+            "_id": job_id, "type": kind, "format": data_format, "state": "queued",
+            "processed": 0, "inserted": 0, "failed": 0, "errors": [],
+            "created_by": get_jwt_identity(), "created_at": time.time()
+        })
+        import_executor.submit(run_import, job_id, kind, data_format, path)
+        return {"message": "Import started", "job_id": job_id,
+                "status_url": url_for('importjobstatus', job_id=job_id)}, 202
+
+
+class ImportJobStatus(Resource):
+    @jwt_required()
+    @admin_required
+    def get(self, job_id):
+        job = db.import_jobs.find_one({"_id": job_id})
+        if not job:
+            return {"message": "Import job not found"}, 404
+        return jsonify(job)
+
+
+class AdminExport(Resource):
+    @jwt_required()
+    @admin_required
+    def get(self):
+        kind = request.args.get('type')
+        if kind not in EXPORT_FIELDS:
+            return {"message": "type must be one of users, projects, tasks"}, 400
+        data_format = request.args.get('format', 'ndjson')
+        if data_format not in ('csv', 'ndjson'):
+            return {"message": "format must be csv or ndjson"}, 400
+
+        fields = EXPORT_FIELDS[kind]
+        projection = {field: 1 for field in fields}
+        projection.setdefault("_id", 0)
+        cursor = db[kind].find({}, projection, batch_size=1000).sort("_id", ASCENDING)
+
+        def generate():
+            # İmleçten okunan her belge hemen yazılır; bellek kullanımı veri boyutundan bağımsız
+            if data_format == 'csv':
+                buffer = io.StringIO()
+                writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction='ignore')
+                writer.writeheader()
+                for document in cursor:
+                    if "_id" in document:
+                        document["_id"] = str(document["_id"])
+                    writer.writerow(document)
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            else:
+                for document in cursor:
+                    if "_id" in document:
+                        document["_id"] = str(document["_id"])
+                    yield json.dumps(document, default=str) + '\n'
+
+        mimetype = 'text/csv' if data_format == 'csv' else 'application/x-ndjson'
+        return Response(generate(), mimetype=mimetype, headers={
+            "Content-Disposition": f"attachment; filename={kind}.{data_format}"
+        })
+
+
 class GetProjects(Resource):
     @jwt_required()
+    @http_cache.cached_response(revisions, 'projects')
     def get(self):
         try:
-            projects = list(db.projects.find({}))
-            for project in projects:
-                project['_id'] = str(project['_id'])
-            return jsonify(projects)
+            limit, after, projection = parse_page_args(PROJECT_FIELDS, ObjectId)
+        except ValueError as e:
+            return {"message": str(e)}, 400
+
+        try:
+            query = {}
+            if request.args.get('status'):
+                query["status"] = request.args.get('status')
+            projects, next_cursor = find_page(db.projects, query, projection, limit, after)
+            return jsonify({"items": projects, "next_cursor": next_cursor})
         except Exception as e:
             return {"message": str(e)}, 500
 
 class GetUserNames(Resource):
     @jwt_required()
+    @http_cache.cached_response(revisions, 'users')
     def get(self):
         try:
-            users = db.users.find({}, {"email": 1, "name": 1, "surname": 1})
+            limit, after, _ = parse_page_args(["email", "name", "surname"], ObjectId)
+        except ValueError as e:
+            return {"message": str(e)}, 400
+
+        try:
+            users, next_cursor = find_page(db.users, {}, {"email": 1, "name": 1, "surname": 1}, limit, after)
             user_names = {user['email']: f"{user['name']} {user['surname']}" for user in users}
-            return jsonify(user_names)
+            return jsonify({"items": user_names, "next_cursor": next_cursor})
         except Exception as e:
             return {"message": str(e)}, 500
 
@@ -282,27 +901,101 @@ class GetProjectTasks(Resource):
     @jwt_required()
     def get(self, project_id):
         try:
-            tasks = list(db.users.aggregate([
-                {"$unwind": "$tasks"},
-                {"$match": {"tasks.project_id": project_id}},
-                {"$replaceRoot": {"newRoot": "$tasks"}}
-            ]))
-            for task in tasks:
-                task['_id'] = str(task['_id'])
-            return jsonify(tasks)
+            limit, after, projection = parse_page_args(TASK_FIELDS)
+        except ValueError as e:
+            return {"message": str(e)}, 400
+
+        try:
+            query = task_filters()
+            query["project_id"] = project_id
+            tasks, next_cursor = find_page(db.tasks, query, projection, limit, after)
+            return jsonify({"items": tasks, "next_cursor": next_cursor})
+        except Exception as e:
+            return {"message": str(e)}, 500
+
+class BatchProjectTasks(Resource):
+    @jwt_required()
+    def post(self):
+        data = request.get_json()
+        if not data:
+            return {"message": "No input data provided"}, 400
+
+        project_ids, error = validation.batch_project_ids(data)
+        if error:
+            return {"message": error}, 400
+
+        try:
+            groups = db.tasks.aggregate(validation.batch_tasks_pipeline(project_ids))
+            return jsonify(validation.batch_tasks_result(project_ids, groups))
         except Exception as e:
             return {"message": str(e)}, 500
 
 class Interns(Resource):
+    @jwt_required()
+    @http_cache.cached_response(revisions, 'users')
+    def get(self):
+        try:
+            limit, after, projection = parse_page_args(INTERN_FIELDS, ObjectId, ["email", "name", "surname"])
+        except ValueError as e:
+            return {"message": str(e)}, 400
+
+        try:
+            interns, next_cursor = find_page(db.users, {"role": "intern"}, projection, limit, after)
+            return jsonify({"items": interns, "next_cursor": next_cursor})
+        except Exception as e:
+            return {"message": str(e)}, 500
+
+
+
+# Dashboard sorguları paralel çalıştırılır; pymongo istemcisi thread-safe
+dashboard_executor = ThreadPoolExecutor(max_workers=8)
+
+
+class Dashboard(Resource):
     @jwt_required()
     def get(self):
+        current_user_email = get_jwt_identity()
+        role = current_user_role()
+        if not role:
+            return {"message": "User not found"}, 404
+
+        # ETag revizyon sayaçlarından gelir; istemcideki kopya güncelse hiçbir sorgu çalışmaz
+        etag = None
         try:
-            interns = db.users.find({"role": "intern"}, {"email": 1, "name": 1, "surname": 1, "_id": 0})
-            interns_list = list(interns)
-            return jsonify(interns_list)
+            etag = validation.dashboard_etag(current_user_email, role, revisions.get(validation.DASHBOARD_COLLECTIONS))
+        except Exception as e:
+            logging.error(f"Failed to read revisions: {e}")
+        if etag and request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+
+        task_query, task_projection, project_projection, directory_projection = \
+            validation.dashboard_queries(current_user_email, role)
+
+        try:
+            # bind: paralel sorgular da bu isteğin ölçümlerine sayılır
+            bind = instrumentation.bind
+            profile_future = dashboard_executor.submit(bind(load_profile), current_user_email)
+            tasks_future = dashboard_executor.submit(bind(find_page), db.tasks, task_query, task_projection, DEFAULT_PAGE_SIZE, None)
+            projects_future = dashboard_executor.submit(bind(find_page), db.projects, {}, project_projection, DEFAULT_PAGE_SIZE, None)
+            directory_future = dashboard_executor.submit(bind(find_page), db.users, {}, directory_projection, DEFAULT_PAGE_SIZE, None)
+
+            user = profile_future.result()
+            if not user:
+                return {"message": "User not found"}, 404
+            payload = validation.dashboard_payload(role, profile_response(user), tasks_future.result(),
+                                                   projects_future.result(), directory_future.result())
         except Exception as e:
             return {"message": str(e)}, 500
 
+        response = jsonify(payload)
+        if etag:
+            # Sıkıştırma gövdeyi değiştirdiği için zayıf ETag
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'private, no-cache'
+        return response
 
 
 class AddProject(Resource):
@@ -314,20 +1007,14 @@ class AddProject(Resource):
             if not data:
                 return {"message": "No input data provided"}, 400
 
-            project_name = data.get('project_name')
-            description = data.get('description')
-            status = data.get('status')
-
-            if not project_name or not description or not status:
-                return {"message": "Project name, description, and status are required"}, 400
-
-            project = {
-                "project_name": project_name,
-                "description": description,
-                "status": status
-            }
+            project, error = build_project(data)
+            if error:
+                return {"message": error}, 400
 
             db.projects.insert_one(project)
+            search.index(db, 'project', [project])
+            revisions.bump('projects')
+            publish_changes([events.make_event('project', 'created', project["_id"], project)])
             return {"message": "Project added successfully"}, 201
         except Exception as e:
             return {"message": str(e)}, 500
@@ -341,21 +1028,15 @@ class UpdateProject(Resource):
             if not data:
                 return {"message": "No input data provided"}, 400
 
-            project_name = data.get('project_name')
-            description = data.get('description')
-            status = data.get('status')
-
-            if not project_name or not description or not status:
-                return {"message": "Project name, description, and status are required"}, 400
-
-            project = {
-                "project_name": project_name,
-                "description": description,
-                "status": status
-            }
+            project, error = build_project(data)
+            if error:
+                return {"message": error}, 400
 
             result = db.projects.update_one({"_id": ObjectId(project_id)}, {"$set": project})
             if result.matched_count == 1:
+                search.index(db, 'project', [dict(project, _id=project_id)])
+                revisions.bump('projects')
+                publish_changes([events.make_event('project', 'updated', project_id, dict(project, _id=project_id))])
                 return {"message": "Project updated successfully"}, 200
             else:
                 return {"message": "Project not found"}, 404
@@ -369,6 +1050,9 @@ class DeleteProject(Resource):
         try:
             result = db.projects.delete_one({"_id": ObjectId(project_id)})
             if result.deleted_count == 1:
+                search.remove(db, 'project', [project_id])
+                revisions.bump('projects')
+                publish_changes([events.make_event('project', 'deleted', project_id)])
                 return {"message": "Project deleted successfully"}, 200
             else:
                 return {"message": "Project not found"}, 404
@@ -385,8 +1069,12 @@ class AssignTaskToProject(Resource):
             if not task_id:
                 return {"message": "Task ID is required"}, 400
 
-            result = db.tasks.update_one({"_id": ObjectId(task_id)}, {"$set": {"project_id": project_id}})
-            if result.matched_count == 1:
+            previous = db.tasks.find_one_and_update({"_id": task_id}, {"$set": {"project_id": project_id}})
+            if previous:
+                task = dict(previous, project_id=project_id)
+                stats.record(db, [(previous, task)])
+                revisions.bump('tasks')
+                publish_changes([events.make_event('task', 'updated', task_id, task)])
                 return {"message": "Task assigned to project successfully"}, 200
             else:
                 return {"message": "Task not found"}, 404
@@ -399,11 +1087,12 @@ class DeleteTask(Resource):
     @admin_required
     def delete(self, task_id):
         try:
-            result = db.users.update_many(
-                {"tasks._id": task_id},
-                {"$pull": {"tasks": {"_id": task_id}}}
-            )
-            if result.modified_count > 0:
+            task = db.tasks.find_one_and_delete({"_id": task_id})
+            if task:
+                stats.record(db, [(task, None)])
+                search.remove(db, 'task', [task_id])
+                revisions.bump('tasks')
+                publish_changes([events.make_event('task', 'deleted', task_id, task)])
                 return {"message": "Task deleted successfully"}, 200
             else:
                 return {"message": "Task not found"}, 404
@@ -416,33 +1105,24 @@ class UpdateTask(Resource):
     def put(self, task_id):
         try:
             data = request.get_json()
-            app.logger.debug(f"Received data for update: {data}")
-
-            update_fields = {
-                "tasks.$.header": data.get('header'),
-                "tasks.$.details": data.get('details'),
-                "tasks.$.status": data.get('status'),
-                "tasks.$.owner": data.get('owner')
-            }
-
-            # Önceki sahipten görevi kaldır
-            db.users.update_one(
-                {"tasks._id": task_id},
-                {"$pull": {"tasks": {"_id": task_id}}}
-            )
+            app.logger.debug("Received data for update: %s", data)
 
-            # Yeni sahip ekle
-            task = {
-                "_id": task_id,
-                "header": data.get('header'),
-                "details": data.get('details'),
-                "status": data.get('status'),
-                "owner": data.get('owner'),
-                "project_id": data.get('project_id')
-            }
-            db.users.update_one({"email": data.get('owner')}, {"$push": {"tasks": task}})
-
-            return {"message": "Task updated successfully"}, 200
+            # Sahip değişse bile görev tek bir belge, tek bir güncelleme yeterli
+            update_fields = validation.task_update_fields(data)
+
+            previous = db.tasks.find_one_and_update(
+                {"_id": task_id}, {"$set": update_fields}, {"owner": 1, "status": 1, "project_id": 1}
+            )
+            if previous:
+                stats.record(db, [(previous, dict(previous, **update_fields))])
+                search.index(db, 'task', [dict(update_fields, _id=task_id)])
+                revisions.bump('tasks')
+                publish_changes([events.make_event(
+                    'task', 'updated', task_id, dict(update_fields, _id=task_id), previous_owner=previous.get("owner")
+                )])
+                return {"message": "Task updated successfully"}, 200
+            else:
+                return {"message": "Task not found"}, 404
         except Exception as e:
             return {"message": str(e)}, 500
 
@@ -450,17 +1130,133 @@ class UpdateTask(Resource):
 
 class GetTask(Resource):
     @jwt_required()
+    @http_cache.cached_response(revisions, 'tasks')
     def get(self, task_id):
         try:
-            user = db.users.find_one({"tasks._id": task_id}, {"tasks.$": 1})
-            if user and 'tasks' in user:
-                return jsonify(user['tasks'][0])
+            task = db.tasks.find_one({"_id": task_id})
+            if task:
+                return jsonify(task)
             else:
                 return {"message": "Task not found"}, 404
         except Exception as e:
             return {"message": str(e)}, 500
 
 
+class Search(Resource):
+    @jwt_required()
+    def get(self):
+        try:
+            text, limit, kinds = validation.parse_search_args(request.args, search.SOURCES)
+        except ValueError as e:
+            return {"message": str(e)}, 400
+
+        role = current_user_role()
+        if not role:
+            return {"message": "User not found"}, 404
+
+        try:
+            # Stajyerler yalnızca kendi görevlerini bulur; projeler ve kullanıcılar herkese açık
+            owner = None if role == 'admin' else get_jwt_identity()
+            return jsonify({"items": search.search(db, text, kinds, owner, limit)})
+        except Exception as e:
+            return {"message": str(e)}, 500
+
+
+class ProjectStats(Resource):
+    @jwt_required()
+    @http_cache.cached_response(revisions, 'tasks')
+    def get(self):
+        try:
+            limit, after, projection = parse_page_args(PROJECT_STATS_FIELDS)
+        except ValueError as e:
+            return {"message": str(e)}, 400
+
+        try:
+            query = {"kind": "project"}
+            if request.args.get('project_ids'):
+                query["project_id"] = {"$in": request.args.get('project_ids').split(',')}
+            items, next_cursor = find_page(db.stats, query, projection, limit, after)
+            return jsonify({"items": items, "next_cursor": next_cursor})
+        except Exception as e:
+            return {"message": str(e)}, 500
+
+class InternStats(Resource):
+    @jwt_required()
+    def get(self):
+        try:
+            limit, after, projection = parse_page_args(OWNER_STATS_FIELDS)
+        except ValueError as e:
+            return {"message": str(e)}, 400
+
+        role = current_user_role()
+        if not role:
+            return {"message": "User not found"}, 404
+
+        try:
+            # Stajyer yalnızca kendi iş yükünü görür
+            query = {"kind": "owner"}
+            if role != 'admin':
+                query["owner"] = get_jwt_identity()
+            elif request.args.get('owner'):
+                query["owner"] = request.args.get('owner')
+            items, next_cursor = find_page(db.stats, query, projection, limit, after)
+            return jsonify({"items": items, "next_cursor": next_cursor})
+        except Exception as e:
+            return {"message": str(e)}, 500
+
+
+class AuditLog(Resource):
+    @jwt_required()
+    @admin_required
+    def get(self):
+        try:
+            limit, after, projection = parse_page_args(AUDIT_FIELDS, ObjectId)
+        except ValueError as e:
+            return {"message": str(e)}, 400
+
+        try:
+            query = {}
+            for field in ("object_id", "actor", "type"):
+                if request.args.get(field):
+                    query[field] = request.args.get(field)
+            entries, next_cursor = find_page(db.audit_log, query, projection, limit, after)
+            return jsonify({"items": entries, "next_cursor": next_cursor})
+        except Exception as e:
+            return {"message": str(e)}, 500
+
+
+class CacheStats(Resource):
+    @jwt_required()
+    @admin_required
+    def get(self):
+        return {"user_cache": user_cache.stats(), "http_cache": http_cache.body_cache.stats()}, 200
+
+
+class Events(Resource):
+    @jwt_required(locations=['headers', 'query_string'])
+    def get(self):
+        current_user_email = get_jwt_identity()
+        role = current_user_role()
+        if not role:
+            return {"message": "User not found"}, 404
+
+        project_ids = []
+        if role != 'admin':
+            project_ids = db.tasks.distinct("project_id", {"owner": current_user_email})
+
+        subscriber = events.broker.subscribe(current_user_email, role, project_ids)
+        if subscriber is None:
+            return {"message": "Too many event subscribers"}, 503, {"Retry-After": "5"}
+
+        return Response(events.broker.stream(subscriber), mimetype='text/event-stream', headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        })
+
+
+class Metrics(Resource):
+    def get(self):
+        return Response(instrumentation.metrics.render(), mimetype='text/plain; version=0.0.4')
 
 
 api.add_resource(UserRegistration, '/register')
@@ -468,11 +1264,15 @@ api.add_resource(UserLogin, '/login')
 api.add_resource(ProtectedResource, '/protected')
 api.add_resource(UserProfile, '/profile')
 api.add_resource(UserProfileUpdate, '/profile')
+api.add_resource(ProfilePicture, '/profile/picture/<user_id>')
 api.add_resource(UserTasks, '/tasks')
+api.add_resource(BulkTasks, '/tasks/bulk')
+api.add_resource(Dashboard, '/dashboard')
 api.add_resource(AddTask, '/addTask')
 api.add_resource(UpdateTaskStatus, '/update_task_status')
 api.add_resource(GetProjects, '/get_projects')
 api.add_resource(GetProjectTasks, '/get_project_tasks/<project_id>')
+api.add_resource(BatchProjectTasks, '/project_tasks/batch')
 api.add_resource(GetUserNames, '/get_user_names')
 api.add_resource(AddProject, '/add_project')
 api.add_resource(UpdateProject, '/update_project/<project_id>')
@@ -482,6 +1282,48 @@ api.add_resource(Interns, '/interns')
 api.add_resource(DeleteTask, '/delete_task/<task_id>')
 api.add_resource(UpdateTask, '/update_task/<task_id>')
 api.add_resource(GetTask, '/get_task/<task_id>')
+api.add_resource(Search, '/search')
+api.add_resource(ProjectStats, '/stats/projects')
+api.add_resource(InternStats, '/stats/interns')
+api.add_resource(AuditLog, '/audit')
+api.add_resource(CacheStats, '/cache_stats')
+api.add_resource(Metrics, '/metrics')
+api.add_resource(AdminImport, '/admin/import')
+api.add_resource(ImportJobStatus, '/admin/import/<job_id>')
+api.add_resource(AdminExport, '/admin/export')
+api.add_resource(Events, '/events')
+
+def init_worker(log_level=None):
+    """Fork'a güvenli olmayan her şeyi (log thread'i, Mongo istemcisi, olay izleyicisi, iş thread'leri) kurar.
+
+    gunicorn'da her worker'da post_worker_init kancasından çağrılır; preload_app açıkken
+    create_app() ana süreçte çalıştığı için thread'ler orada başlatılmaz.
+    """
+    configure_logging(log_level)
+    init_db()
+    try:
+        events.broker.start(db)
+    except Exception as e:
+        logging.error(f"Failed to start event source: {e}")
+    job_queue.start(JOBS_WORKER_THREADS)
+    instrumentation.metrics.start()
+
+
+def create_app(log_level=None):
+    """gunicorn/WSGI giriş noktası: `gunicorn -c gunicorn.conf.py` bunu `app:create_app()` olarak çağırır.
+
+    Yalnızca indeksleri kurar; worker thread'leri init_worker() başlatır.
+    """
+    configure_logging(log_level)
+    try:
+        ensure_indexes()
+    except Exception as e:
+        logging.error(f"Failed to create indexes: {e}")
+    return app
+
 
 if __name__ == '__main__':
+    log_level = os.environ.get('LOG_LEVEL', 'DEBUG')
+    create_app(log_level)
+    init_worker(log_level)
     app.run(host='0.0.0.0', port=5000)
@@ -0,0 +1,1088 @@
+"""API'nin ASGI sürümü: Starlette + Motor.
+
+Flask sürümüyle (app.py) aynı yolları ve JSON sözleşmelerini sunar ve yan yana
+çalışabilir: aynı MONGO_URI/MONGO_DB_NAME'i ve JWT_SECRET_KEY'i okur, birinin
+verdiği token diğerinde geçerlidir. Doğrulama, sayfalama ve yanıt biçimleri
+validation.py'den; şifre hash'leme ve giriş sınırlaması passwords.py'den;
+sayaç, arama ve iş kuyruğu belgeleri stats/search/jobs modüllerinden gelir,
+yalnızca Mongo çağrıları Motor ile beklenir.
+
+    uvicorn asgi:app --port 5001 --workers 4
+
+/events de burada sunulur: abonelikler thread tutmadığı için çok sayıda açık
+sekme gunicorn worker'larını doldurmaz. Olaylar Flask sürümüyle aynı kaynaktan
+(change stream ya da `events_feed`) okunur ve oraya yazılır; iki sürümden birine
+yapılan yazma diğerinin abonelerine de ulaşır (EVENTS_SOURCE=local hariç).
+
+Şu yollar bilerek yalnızca Flask sürümünde kalır ve burada 404 döner:
+/tasks/bulk, /admin/import (ve /admin/import/<job_id>), /admin/export, /metrics
+ve /cache_stats. Toplu yazma ve içe/dışa aktarma yönetici işleridir, gunicorn
+thread'leriyle yeterince hızlıdır; /metrics ve /cache_stats ise Flask sürecinin
+ölçümlerini ve önbelleklerini raporlar. Bu yolları kullanan istemciler Flask
+sürümüne yönlendirilmelidir; compat_check.py 404'ü de kontrol eder. İndeksler Flask sürümü ya da `python indexes.py apply`
+ile oluşturulur; belgenin içinde saklanan eski profil fotoğrafları da ilk
+okumada Flask sürümü tarafından diske taşınır. İki sürümün aynı davrandığı
+`python compat_check.py` ile kontrol edilir.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+
+import jwt
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, CursorType, ReturnDocument
+from pymongo.errors import CollectionInvalid, DuplicateKeyError, PyMongoError
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import FileResponse, JSONResponse as _JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+import events
+import http_cache
+import jobs
+import search
+import stats
+import validation
+from profile_pictures import PROFILE_PICTURE_MAX_AGE, picture_extension, picture_path, save_profile_picture
+from passwords import HasherBusy, LOGIN_ATTEMPT_WINDOW, email_throttle, ip_throttle, password_hasher
+from validation import (AUDIT_FIELDS, DEFAULT_PAGE_SIZE, INTERN_FIELDS, OWNER_STATS_FIELDS, PROJECT_FIELDS,
+                        PROJECT_STATS_FIELDS, TASK_FIELDS, build_project, build_task, build_user)
+
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO'))
+logger = logging.getLogger('asgi')
+
+# MongoDB connection
+MONGO_URI = os.environ.get('MONGO_URI', "mongodb://localhost:27017/")
+MONGO_DB_NAME = os.environ.get('MONGO_DB_NAME', 'intern_management')
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', 100))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', 5000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', 30000))
+MONGO_READ_PREFERENCE = os.environ.get('MONGO_READ_PREFERENCE', 'primary')
+
+# flask_jwt_extended ile aynı ayarlar: HS256, 15 dakikalık access token
+JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your_jwt_secret_key')
+JWT_ALGORITHM = 'HS256'
+JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=15)
+
+client = None
+db = None
+
+
+def init_db():
+    """Motor istemcisini kurar; bağlantılar ilk sorguda, çalışan olay döngüsünde açılır."""
+    global client, db
+    client = AsyncIOMotorClient(
+        MONGO_URI,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+        readPreference=MONGO_READ_PREFERENCE
+    )
+    db = client[MONGO_DB_NAME]
+    return db
+
+
+init_db()
+
+
+class JSONResponse(_JSONResponse):
+    def render(self, content):
+        # Flask'ın jsonify'ı gibi tarih ve ObjectId gibi değerleri metne çevirir
+        return json.dumps(content, default=str, separators=(',', ':')).encode('utf-8')
+
+
+def message(text, status_code, headers=None):
+    return JSONResponse({"message": text}, status_code, headers)
+
+
+async def get_json(request):
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+def full_path(request):
+    # werkzeug'un request.full_path'i ile aynı biçim; ETag'ler iki sürümde aynı çıkar
+    return f"{request.url.path}?{request.url.query}"
+
+
+def etag_matches(request, etag):
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate.strip('"') == etag:
+            return True
+    return False
+
+
+# Kimlik doğrulama: flask_jwt_extended'in ürettiği ve beklediği token biçimi
+def create_access_token(identity, role):
+    now = datetime.now(timezone.utc)
+    claims = {
+        "fresh": False, "iat": now, "jti": str(uuid.uuid4()), "type": "access", "sub": identity,
+        "nbf": now, "exp": now + JWT_ACCESS_TOKEN_EXPIRES, "role": role
+    }
+    return jwt.encode(claims, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+
+
+def decode_token(request, query_string=False):
+    """(claims, hata yanıtı) döner; hata gövdeleri flask_jwt_extended'inkilerle aynıdır.
+
+    query_string=True ise başlık yoksa token `?token=` parametresinden okunur (EventSource için).
+    """
+    header = request.headers.get('authorization')
+    token = None
+    if not header:
+        error = "Missing Authorization Header"
+    else:
+        parts = header.split()
+        if parts[0] != 'Bearer':
+            error = "Missing 'Bearer' type in 'Authorization' header. Expected 'Authorization: Bearer <JWT>'"
+        elif len(parts) != 2:
+            return None, JSONResponse({"msg": "Bad Authorization header. Expected 'Authorization: Bearer <JWT>'"}, 422)
+        else:
+            token = parts[1]
+    if token is None and query_string:
+        token = request.query_params.get('token')
+        if token is None:
+            return None, JSONResponse({"msg": f"Missing JWT in headers or query_string ({error}; "
+                                              f"Missing 'token' query paramater)"}, 401)
+    if token is None:
+        return None, JSONResponse({"msg": error}, 422 if header else 401)
+    try:
+        claims = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        return None, JSONResponse({"msg": "Token has expired"}, 401)
+    except jwt.InvalidTokenError as e:
+        return None, JSONResponse({"msg": str(e)}, 422)
+    if claims.get("type") != "access":
+        return None, JSONResponse({"msg": "Only non-refresh tokens are allowed"}, 422)
+    return claims, None
+
+
+def jwt_required(fn):
+    @wraps(fn)
+    async def wrapper(request):
+        claims, error = decode_token(request)
+        if error:
+            return error
+        request.state.identity = claims["sub"]
+        request.state.claims = claims
+        return await fn(request)
+    return wrapper
+
+
+async def current_user_role(request):
+    # Rol giriş sırasında token'a yazılır; eski token'lar için kullanıcı belgesine bakılır
+    role = request.state.claims.get("role")
+    if role:
+        return role
+    user = await db.users.find_one({"email": request.state.identity}, {"_id": 0, "role": 1})
+    return user.get("role") if user else None
+
+
+def admin_required(fn):
+    @wraps(fn)
+    async def wrapper(request):
+        if await current_user_role(request) == "admin":
+            return await fn(request)
+        return message("Admin access required", 403)
+    return wrapper
+
+
+class RevisionTracker:
+    """http_cache.RevisionTracker'ın Motor karşılığı; aynı `revisions` belgelerini okur ve artırır."""
+
+    def __init__(self):
+        self._local = {}
+
+    async def get(self, names):
+        now = time.monotonic()
+        cached = [self._local.get(name) for name in names]
+        if all(entry and entry[0] > now for entry in cached):
+            return tuple(entry[1] for entry in cached)
+
+        found = {doc["_id"]: doc.get("rev", 0)
+                 async for doc in db.revisions.find({"_id": {"$in": list(names)}})}
+        for name in names:
+            self._local[name] = (now + http_cache.REVISION_TTL, found.get(name, 0))
+        return tuple(found.get(name, 0) for name in names)
+
+    async def bump(self, *names):
+        for name in names:
+            try:
+                doc = await db.revisions.find_one_and_update(
+                    {"_id": name}, {"$inc": {"rev": 1}}, upsert=True, return_document=ReturnDocument.AFTER
+                )
+                self._local[name] = (time.monotonic() + http_cache.REVISION_TTL, doc["rev"])
+            except Exception as e:
+                logger.error(f"Failed to bump revision for {name}: {e}")
+                self._local.pop(name, None)
+
+
+revisions = RevisionTracker()
+
+
+def cached_response(*collections):
+    """http_cache.cached_response ile aynı ETag'i ve gövde önbelleğini kullanır."""
+    def decorator(fn):
+        @wraps(fn)
+        async def wrapper(request):
+            try:
+                versions = await revisions.get(collections)
+            except Exception as e:
+                logger.error(f"Failed to read revisions: {e}")
+                return await fn(request)
+
+            etag = http_cache.revision_etag(full_path(request), versions)
+            if etag_matches(request, etag):
+                response = Response(status_code=304)
+            else:
+                body = http_cache.body_cache.get(etag)
+                if body is None:
+                    result = await fn(request)
+                    if result.status_code != 200:
+                        return result
+                    body = result.body
+                    http_cache.body_cache.set(etag, body)
+                response = Response(body, media_type='application/json')
+
+            response.headers['ETag'] = f'W/"{etag}"'
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
+
+
+# Yazma kaynaklarının yan etkileri; hataları isteği başarısız kılmaz
+async def record_stats(changes):
+    operations = stats.operations(changes)
+    if not operations:
+        return
+    try:
+        await db.stats.bulk_write(operations, ordered=False)
+    except Exception as e:
+        logger.error(f"Failed to update task stats: {e}")
+
+
+async def index_search(kind, documents):
+    operations = search.index_operations(kind, documents)
+    if not operations:
+        return
+    try:
+        await db.search.bulk_write(operations, ordered=False)
+    except Exception as e:
+        logger.error(f"Failed to update search index: {e}")
+
+
+async def remove_search(kind, ids):
+    try:
+        await db.search.delete_many({"_id": {"$in": [f"{kind}:{object_id}" for object_id in ids]}})
+    except Exception as e:
+        logger.error(f"Failed to update search index: {e}")
+
+
+async def publish_changes(request, changes):
+    """Olayları SSE abonelerine yayınlar, audit/notify işlerini kuyruğa atar."""
+    await publish_events(changes)
+    queued = []
+    for event in changes:
+        queued.extend(jobs.jobs_for_event(event, request.state.identity))
+    if not queued:
+        return
+    try:
+        await db.jobs.insert_many(queued, ordered=False)
+    except Exception as e:
+        logger.error(f"Failed to enqueue {len(queued)} jobs: {e}")
+
+
+# Olay akışı: events.EventBroker'ın abone listesi ve filtreleri, kaynaklar Motor ile izlenir
+broker = events.EventBroker()
+
+
+async def publish_events(changes):
+    """events.EventBroker.publish'in karşılığı; change stream aktifse olaylar oradan gelir."""
+    if not changes or broker.source == 'changestream':
+        return
+    if broker.source == 'feed':
+        try:
+            await db[events.FEED_COLLECTION].insert_many([events.feed_document(event) for event in changes])
+            return
+        except PyMongoError as e:
+            logger.error(f"Failed to write events to feed: {e}")
+    for event in changes:
+        broker.dispatch(event)
+
+
+async def open_feed():
+    try:
+        await db.create_collection(events.FEED_COLLECTION, capped=True, size=events.EVENTS_FEED_BYTES)
+    except CollectionInvalid:
+        pass
+    feed = db[events.FEED_COLLECTION]
+    if not (await feed.options()).get('capped'):
+        raise CollectionInvalid(f"{events.FEED_COLLECTION} exists but is not capped")
+    last = await feed.find_one({}, {"_id": 1}, sort=[("$natural", -1)])
+    return feed, last["_id"] if last else None
+
+
+async def watch_changes(stream):
+    resume_token = None
+    while True:
+        try:
+            if stream is None:
+                stream = db.watch(events.change_pipeline(), full_document='updateLookup',
+                                  resume_after=resume_token, max_await_time_ms=1000)
+            async with stream:
+                async for change in stream:
+                    resume_token = stream.resume_token
+                    broker.dispatch(events.event_from_change(change))
+        except PyMongoError as e:
+            logger.warning(f"Change stream interrupted, retrying: {e}")
+            await asyncio.sleep(1)
+        stream = None
+
+
+async def tail_feed(feed, last_id):
+    while True:
+        try:
+            query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+            cursor = feed.find(query, cursor_type=CursorType.TAILABLE_AWAIT, max_await_time_ms=1000)
+            while cursor.alive:
+                async for document in cursor:
+                    last_id = document["_id"]
+                    broker.dispatch(document["event"])
+        except PyMongoError as e:
+            logger.warning(f"Event feed interrupted, retrying: {e}")
+        await asyncio.sleep(1)
+
+
+async def start_events(source=None):
+    """events.EventBroker.start'ın karşılığı; izleme görevini (yoksa None) döner."""
+    source = source or events.EVENTS_SOURCE
+    broker.source = 'local'
+    if source == 'local':
+        return None
+
+    if source in ('auto', 'changestream'):
+        stream = db.watch(events.change_pipeline(), full_document='updateLookup', max_await_time_ms=1000)
+        try:
+            # İlk okuma akışı açar; replica set yoksa burada hata verir
+            change = await stream.try_next()
+        except PyMongoError as e:
+            if source == 'changestream':
+                raise
+            logger.info(f"Change streams unavailable, using the {events.FEED_COLLECTION} collection: {e}")
+        else:
+            broker.source = 'changestream'
+            if change is not None:
+                broker.dispatch(events.event_from_change(change))
+            return asyncio.create_task(watch_changes(stream))
+
+    try:
+        feed, last_id = await open_feed()
+    except PyMongoError as e:
+        if source == 'feed':
+            raise
+        logger.warning(f"Event feed unavailable, using in-process events only: {e}")
+        return None
+    broker.source = 'feed'
+    return asyncio.create_task(tail_feed(feed, last_id))
+
+
+async def event_stream(subscriber):
+    """events.EventBroker.stream'in async karşılığı; bağlantı kapanınca aboneliği sonlandırır."""
+    try:
+        yield events.sse('ready', {'source': broker.source})
+        while True:
+            if subscriber.lagging:
+                subscriber.lagging = False
+                subscriber.clear()
+                yield events.sse('resync', {})
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), events.EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield events.KEEPALIVE
+                continue
+            yield events.sse(event['type'], event)
+    finally:
+        broker.unsubscribe(subscriber)
+
+
+async def find_page(collection, query, projection, limit, after):
+    query, projection, drop_id = validation.page_query(query, projection, after)
+    docs = await collection.find(query, projection).sort("_id", ASCENDING).limit(limit + 1).to_list(None)
+    return validation.page_result(docs, limit, drop_id)
+
+
+def page_response(page):
+    items, next_cursor = page
+    return JSONResponse({"items": items, "next_cursor": next_cursor})
+
+
+async def load_profile(email):
+    return await db.users.find_one({"email": email}, {"password": 0})
+
+
+def profile_response(request, user):
+    picture = user.get("profile_picture")
+    user["profile_picture"] = None
+    if isinstance(picture, str) and picture:
+        user["profile_picture"] = (f"{request.base_url}profile/picture/{user['_id']}"
+                                   f"?v={user.get('profile_picture_version', 0)}")
+    user.pop("profile_picture_version", None)
+    del user["_id"]
+    return user
+
+
+async def register(request):
+    data = await get_json(request)
+    if not data:
+        return message("No input data provided", 400)
+
+    user, error = build_user(data)
+    if error:
+        return message(error, 400)
+    email = user["email"]
+
+    if await db.users.find_one({"email": email}, {"_id": 1}):
+        return message("User already exists", 409)
+
+    try:
+        hashed_password = await password_hasher.hash_async(data.get('password'))
+    except HasherBusy:
+        return message("Server is busy, please try again", 503, {"Retry-After": "1"})
+    except Exception as e:
+        logger.error(f"Password hashing failed: {e}")
+        return message("Password hashing failed", 500)
+
+    try:
+        user["password"] = hashed_password
+        await db.users.insert_one(user)
+        await index_search('user', [user])
+        await revisions.bump('users')
+        return message("User registered successfully", 201)
+    except DuplicateKeyError:
+        return message("User already exists", 409)
+    except Exception as e:
+        logger.error(f"User registration failed: {e}")
+        return message(str(e), 500)
+
+
+async def login(request):
+    data = await get_json(request)
+    if not data:
+        return message("No input data provided", 400)
+
+    email = data.get('email')
+    password = data.get('password')
+    if not email or not password:
+        return message("Email and password are required", 400)
+
+    client_ip = request.client.host if request.client else None
+    if (await ip_throttle.blocked_async(db.login_attempts, client_ip)
+            or not await email_throttle.hit_async(db.login_attempts, email)):
+        return message("Too many login attempts, please try again later", 429,
+                       {"Retry-After": str(LOGIN_ATTEMPT_WINDOW)})
+
+    user = await db.users.find_one({"email": email})
+    try:
+        valid = bool(user) and await password_hasher.verify_async(password, user['password'])
+    except HasherBusy:
+        return message("Server is busy, please try again", 503, {"Retry-After": "1"})
+
+    if not valid:
+        await ip_throttle.record_async(db.login_attempts, client_ip)
+        return message("Invalid credentials", 401)
+
+    await email_throttle.reset_async(db.login_attempts, email)
+    if password_hasher.needs_rehash(user['password']):
+        try:
+            await db.users.update_one({"_id": user["_id"]},
+                                      {"$set": {"password": await password_hasher.hash_async(password)}})
+        except Exception as e:
+            logger.warning(f"Password rehash failed for {email}: {e}")
+    return JSONResponse({"message": "Login successful",
+                         "access_token": create_access_token(email, user.get("role"))})
+
+
+@jwt_required
+async def protected(request):
+    return JSONResponse({"message": f"Hello, {request.state.identity}"})
+
+
+@jwt_required
+async def profile(request):
+    user = await load_profile(request.state.identity)
+    if not user:
+        return message("User not found", 404)
+    return JSONResponse(profile_response(request, user))
+
+
+@jwt_required
+async def update_profile(request):
+    form = await request.form()
+    email = request.state.identity
+    update_fields = validation.profile_update_fields(form)
+
+    upload = form.get('profile_picture')
+    if upload is not None and not isinstance(upload, str):
+        extension = picture_extension(upload.filename)
+        if extension is None:
+            return message("Unsupported profile picture type", 400)
+
+        user = await db.users.find_one({"email": email}, {"_id": 1})
+        if not user:
+            return message("User not found", 404)
+        try:
+            content = await upload.read()
+            update_fields["profile_picture"] = await run_in_threadpool(
+                save_profile_picture, user["_id"], content, extension)
+            update_fields["profile_picture_version"] = int(time.time())
+        except ValueError as e:
+            return message(str(e), 400)
+        except Exception as e:
+            logger.error(f"Saving profile picture failed: {e}")
+            return message("Saving profile picture failed", 500)
+
+    try:
+        # Arama kaydı rol gibi formda olmayan alanları da içerdiği için güncel belgeden kurulur
+        user = await db.users.find_one_and_update({"email": email}, {"$set": update_fields},
+                                                  search.source_projection('user'),
+                                                  return_document=ReturnDocument.AFTER)
+        if not user:
+            return message("User not found", 404)
+        await index_search('user', [user])
+        await revisions.bump('users')
+        return message("Profile updated successfully", 200)
+    except Exception as e:
+        return message(str(e), 500)
+
+
+async def profile_picture(request):
+    # <img> etiketleri Authorization başlığı gönderemediği için bu uç nokta herkese açık
+    user_id = request.path_params['user_id']
+    if not ObjectId.is_valid(user_id):
+        return message("User not found", 404)
+
+    user = await db.users.find_one({"_id": ObjectId(user_id)}, {"profile_picture": 1})
+    if not user or not isinstance(user.get("profile_picture"), str):
+        return message("Profile picture not found", 404)
+
+    path = picture_path(user_id, user["profile_picture"], request.query_params.get('size'))
+    if path is None:
+        return message("Profile picture not found", 404)
+
+    # FileResponse Range isteklerini yönetir; 304 için ETag burada karşılaştırılır
+    response = FileResponse(path, headers={"Cache-Control": f"public, max-age={PROFILE_PICTURE_MAX_AGE}"},
+                            stat_result=os.stat(path))
+    etag = response.headers['etag'].strip('"')
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": response.headers['etag'],
+                                                  "Cache-Control": response.headers['cache-control']})
+    return response
+
+
+async def events_endpoint(request):
+    claims, error = decode_token(request, query_string=True)
+    if error:
+        return error
+    request.state.identity = claims["sub"]
+    request.state.claims = claims
+    email = request.state.identity
+    role = await current_user_role(request)
+    if not role:
+        return message("User not found", 404)
+
+    project_ids = []
+    if role != 'admin':
+        project_ids = await db.tasks.distinct("project_id", {"owner": email})
+
+    subscriber = broker.subscribe(email, role, project_ids, events.AsyncSubscriber)
+    if subscriber is None:
+        return message("Too many event subscribers", 503, {"Retry-After": "5"})
+
+    return StreamingResponse(event_stream(subscriber), media_type='text/event-stream', headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+
+@jwt_required
+async def user_tasks(request):
+    role = await current_user_role(request)
+    if not role:
+        return message("User not found", 404)
+    try:
+        limit, after, projection = validation.parse_page_args(request.query_params, TASK_FIELDS)
+    except ValueError as e:
+        return message(str(e), 400)
+
+    query = validation.task_filters(request.query_params)
+    if role == 'intern':
+        query["owner"] = request.state.identity
+    elif role != 'admin':
+        return message("Unknown role", 400)
+    return page_response(await find_page(db.tasks, query, projection, limit, after))
+
+
+@jwt_required
+async def dashboard(request):
+    email = request.state.identity
+    role = await current_user_role(request)
+    if not role:
+        return message("User not found", 404)
+
+    etag = None
+    try:
+        etag = validation.dashboard_etag(email, role, await revisions.get(validation.DASHBOARD_COLLECTIONS))
+    except Exception as e:
+        logger.error(f"Failed to read revisions: {e}")
+    if etag and etag_matches(request, etag):
+        return Response(status_code=304, headers={'ETag': f'W/"{etag}"', 'Cache-Control': 'private, no-cache'})
+
+    task_query, task_projection, project_projection, directory_projection = \
+        validation.dashboard_queries(email, role)
+    try:
+        user, tasks_page, projects_page, directory_page = await asyncio.gather(
+            load_profile(email),
+            find_page(db.tasks, task_query, task_projection, DEFAULT_PAGE_SIZE, None),
+            find_page(db.projects, {}, project_projection, DEFAULT_PAGE_SIZE, None),
+            find_page(db.users, {}, directory_projection, DEFAULT_PAGE_SIZE, None)
+        )
+        if not user:
+            return message("User not found", 404)
+        payload = validation.dashboard_payload(role, profile_response(request, user), tasks_page,
+                                               projects_page, directory_page)
+    except Exception as e:
+        return message(str(e), 500)
+
+    response = JSONResponse(payload)
+    if etag:
+        response.headers['ETag'] = f'W/"{etag}"'
+        response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@jwt_required
+@admin_required
+async def add_task(request):
+    try:
+        data = await get_json(request)
+        if not data:
+            return message("No input data provided", 400)
+
+        task, error = build_task(data)
+        if error:
+            return message(error, 400)
+
+        await db.tasks.insert_one(task)
+        await record_stats([(None, task)])
+        await index_search('task', [task])
+        await revisions.bump('tasks')
+        await publish_changes(request, [events.make_event('task', 'created', task["_id"], task)])
+        return JSONResponse({"message": "Task added successfully", "task_id": task["_id"]}, 201)
+    except Exception as e:
+        logger.error(f"Error adding task: {e}")
+        return message(str(e), 500)
+
+
+@jwt_required
+async def update_task_status(request):
+    try:
+        data = await get_json(request)
+        task_id = data.get('task_id')
+        new_status = data.get('status')
+        if not task_id or not new_status:
+            return message("Task ID and new status are required", 400)
+
+        previous = await db.tasks.find_one_and_update(
+            {"_id": task_id, "status": {"$ne": new_status}},
+            {"$set": {"status": new_status}}
+        )
+        if not previous:
+            return message("Task not found or no changes made", 404)
+
+        task = dict(previous, status=new_status)
+        await record_stats([(previous, task)])
+        await revisions.bump('tasks')
+        await publish_changes(request, [events.make_event('task', 'updated', task_id, task)])
+        return message("Task status updated successfully", 200)
+    except Exception as e:
+        logger.error(f"Error updating task status: {e}")
+        return message(str(e), 500)
+
+
+@jwt_required
+@cached_response('projects')
+async def get_projects(request):
+    try:
+        limit, after, projection = validation.parse_page_args(request.query_params, PROJECT_FIELDS, ObjectId)
+    except ValueError as e:
+        return message(str(e), 400)
+
+    try:
+        query = {}
+        if request.query_params.get('status'):
+            query["status"] = request.query_params.get('status')
+        return page_response(await find_page(db.projects, query, projection, limit, after))
+    except Exception as e:
+        return message(str(e), 500)
+
+
+@jwt_required
+@cached_response('users')
+async def get_user_names(request):
+    try:
+        limit, after, _ = validation.parse_page_args(request.query_params, ["email", "name", "surname"], ObjectId)
+    except ValueError as e:
+        return message(str(e), 400)
+
+    try:
+        users, next_cursor = await find_page(db.users, {}, {"email": 1, "name": 1, "surname": 1}, limit, after)
+        user_names = {user['email']: f"{user['name']} {user['surname']}" for user in users}
+        return JSONResponse({"items": user_names, "next_cursor": next_cursor})
+    except Exception as e:
+        return message(str(e), 500)
+
+
+@jwt_required
+async def get_project_tasks(request):
+    try:
+        limit, after, projection = validation.parse_page_args(request.query_params, TASK_FIELDS)
+    except ValueError as e:
+        return message(str(e), 400)
+
+    try:
+        query = validation.task_filters(request.query_params)
+        query["project_id"] = request.path_params["project_id"]
+        return page_response(await find_page(db.tasks, query, projection, limit, after))
+    except Exception as e:
+        return message(str(e), 500)
+
+
+@jwt_required
+async def batch_project_tasks(request):
+    data = await get_json(request)
+    if not data:
+        return message("No input data provided", 400)
+
+    project_ids, error = validation.batch_project_ids(data)
+    if error:
+        return message(error, 400)
+
+    try:
+        groups = await db.tasks.aggregate(validation.batch_tasks_pipeline(project_ids)).to_list(None)
+        return JSONResponse(validation.batch_tasks_result(project_ids, groups))
+    except Exception as e:
+        return message(str(e), 500)
+
+
+@jwt_required
+@cached_response('users')
+async def interns(request):
+    try:
+        limit, after, projection = validation.parse_page_args(request.query_params, INTERN_FIELDS, ObjectId,
+                                                              ["email", "name", "surname"])
+    except ValueError as e:
+        return message(str(e), 400)
+
+    try:
+        return page_response(await find_page(db.users, {"role": "intern"}, projection, limit, after))
+    except Exception as e:
+        return message(str(e), 500)
+
+
+@jwt_required
+@admin_required
+async def add_project(request):
+    try:
+        data = await get_json(request)
+        if not data:
+            return message("No input data provided", 400)
+
+        project, error = build_project(data)
+        if error:
+            return message(error, 400)
+
+        await db.projects.insert_one(project)
+        await index_search('project', [project])
+        await revisions.bump('projects')
+        await publish_changes(request, [events.make_event('project', 'created', project["_id"], project)])
+        return message("Project added successfully", 201)
+    except Exception as e:
+        return message(str(e), 500)
+
+
+@jwt_required
+@admin_required
+async def update_project(request):
+    project_id = request.path_params["project_id"]
+    try:
+        data = await get_json(request)
+        if not data:
+            return message("No input data provided", 400)
+
+        project, error = build_project(data)
+        if error:
+            return message(error, 400)
+
+        result = await db.projects.update_one({"_id": ObjectId(project_id)}, {"$set": project})
+        if result.matched_count != 1:
+            return message("Project not found", 404)
+
+        await index_search('project', [dict(project, _id=project_id)])
+        await revisions.bump('projects')
+        await publish_changes(request, [events.make_event('project', 'updated', project_id,
+                                                          dict(project, _id=project_id))])
+        return message("Project updated successfully", 200)
+    except Exception as e:
+        return message(str(e), 500)
+
+
+@jwt_required
+@admin_required
+async def delete_project(request):
+    project_id = request.path_params["project_id"]
+    try:
+        result = await db.projects.delete_one({"_id": ObjectId(project_id)})
+        if result.deleted_count != 1:
+            return message("Project not found", 404)
+
+        await remove_search('project', [project_id])
+        await revisions.bump('projects')
+        await publish_changes(request, [events.make_event('project', 'deleted', project_id)])
+        return message("Project deleted successfully", 200)
+    except Exception as e:
+        return message(str(e), 500)
+
+
+@jwt_required
+async def assign_task_to_project(request):
+    project_id = request.path_params["project_id"]
+    try:
+        data = await get_json(request)
+        task_id = data.get('task_id')
+        if not task_id:
+            return message("Task ID is required", 400)
+
+        previous = await db.tasks.find_one_and_update({"_id": task_id}, {"$set": {"project_id": project_id}})
+        if not previous:
+            return message("Task not found", 404)
+
+        task = dict(previous, project_id=project_id)
+        await record_stats([(previous, task)])
+        await revisions.bump('tasks')
+        await publish_changes(request, [events.make_event('task', 'updated', task_id, task)])
+        return message("Task assigned to project successfully", 200)
+    except Exception as e:
+        return message(str(e), 500)
+
+
+@jwt_required
+@admin_required
+async def delete_task(request):
+    task_id = request.path_params["task_id"]
+    try:
+        task = await db.tasks.find_one_and_delete({"_id": task_id})
+        if not task:
+            return message("Task not found", 404)
+
+        await record_stats([(task, None)])
+        await remove_search('task', [task_id])
+        await revisions.bump('tasks')
+        await publish_changes(request, [events.make_event('task', 'deleted', task_id, task)])
+        return message("Task deleted successfully", 200)
+    except Exception as e:
+        return message(str(e), 500)
+
+
+@jwt_required
+@admin_required
+async def update_task(request):
+    task_id = request.path_params["task_id"]
+    try:
+        data = await get_json(request)
+        update_fields = validation.task_update_fields(data)
+
+        previous = await db.tasks.find_one_and_update(
+            {"_id": task_id}, {"$set": update_fields}, projection={"owner": 1, "status": 1, "project_id": 1}
+        )
+        if not previous:
+            return message("Task not found", 404)
+
+        await record_stats([(previous, dict(previous, **update_fields))])
+        await index_search('task', [dict(update_fields, _id=task_id)])
+        await revisions.bump('tasks')
+        await publish_changes(request, [events.make_event(
+            'task', 'updated', task_id, dict(update_fields, _id=task_id), previous_owner=previous.get("owner")
+        )])
+        return message("Task updated successfully", 200)
+    except Exception as e:
+        return message(str(e), 500)
+
+
+@jwt_required
+@cached_response('tasks')
+async def get_task(request):
+    try:
+        task = await db.tasks.find_one({"_id": request.path_params["task_id"]})
+        if not task:
+            return message("Task not found", 404)
+        return JSONResponse(task)
+    except Exception as e:
+        return message(str(e), 500)
+
+
+@jwt_required
+async def search_endpoint(request):
+    try:
+        text, limit, kinds = validation.parse_search_args(request.query_params, search.SOURCES)
+    except ValueError as e:
+        return message(str(e), 400)
+
+    role = await current_user_role(request)
+    if not role:
+        return message("User not found", 404)
+
+    try:
+        owner = None if role == 'admin' else request.state.identity
+        query_terms, query = search.build_query(text, kinds, owner)
+        items = []
+        if query is not None:
+            candidates = {}
+            for field in search.CANDIDATE_TIERS:
+                if len(candidates) >= limit:
+                    break
+                cursor = db.search.find(search.tier_query(query, field, candidates), {name: 0 for name in search.INDEX_FIELDS})
+                for entry in await cursor.limit(search.SEARCH_CANDIDATES).to_list(None):
+                    candidates[entry.pop("_id")] = entry
+            items = search.rank(list(candidates.values()), query_terms, limit)
+        return JSONResponse({"items": items})
+    except Exception as e:
+        return message(str(e), 500)
+
+
+@jwt_required
+@cached_response('tasks')
+async def project_stats(request):
+    try:
+        limit, after, projection = validation.parse_page_args(request.query_params, PROJECT_STATS_FIELDS)
+    except ValueError as e:
+        return message(str(e), 400)
+
+    try:
+        query = {"kind": "project"}
+        if request.query_params.get('project_ids'):
+            query["project_id"] = {"$in": request.query_params.get('project_ids').split(',')}
+        return page_response(await find_page(db.stats, query, projection, limit, after))
+    except Exception as e:
+        return message(str(e), 500)
+
+
+@jwt_required
+async def intern_stats(request):
+    try:
+        limit, after, projection = validation.parse_page_args(request.query_params, OWNER_STATS_FIELDS)
+    except ValueError as e:
+        return message(str(e), 400)
+
+    role = await current_user_role(request)
+    if not role:
+        return message("User not found", 404)
+
+    try:
+        query = {"kind": "owner"}
+        if role != 'admin':
+            query["owner"] = request.state.identity
+        elif request.query_params.get('owner'):
+            query["owner"] = request.query_params.get('owner')
+        return page_response(await find_page(db.stats, query, projection, limit, after))
+    except Exception as e:
+        return message(str(e), 500)
+
+
+@jwt_required
+@admin_required
+async def audit_log(request):
+    try:
+        limit, after, projection = validation.parse_page_args(request.query_params, AUDIT_FIELDS, ObjectId)
+    except ValueError as e:
+        return message(str(e), 400)
+
+    try:
+        query = {}
+        for field in ("object_id", "actor", "type"):
+            if request.query_params.get(field):
+                query[field] = request.query_params.get(field)
+        return page_response(await find_page(db.audit_log, query, projection, limit, after))
+    except Exception as e:
+        return message(str(e), 500)
+
+
+routes = [
+    Route('/register', register, methods=['POST']),
+    Route('/login', login, methods=['POST']),
+    Route('/protected', protected, methods=['GET']),
+    Route('/profile', profile, methods=['GET']),
+    Route('/profile', update_profile, methods=['PUT']),
+    Route('/profile/picture/{user_id}', profile_picture, methods=['GET']),
+    Route('/tasks', user_tasks, methods=['GET']),
+    Route('/dashboard', dashboard, methods=['GET']),
+    Route('/addTask', add_task, methods=['POST']),
+    Route('/update_task_status', update_task_status, methods=['PUT']),
+    Route('/get_projects', get_projects, methods=['GET']),
+    Route('/get_project_tasks/{project_id}', get_project_tasks, methods=['GET']),
+    Route('/project_tasks/batch', batch_project_tasks, methods=['POST']),
+    Route('/get_user_names', get_user_names, methods=['GET']),
+    Route('/add_project', add_project, methods=['POST']),
+    Route('/update_project/{project_id}', update_project, methods=['PUT']),
+    Route('/delete_project/{project_id}', delete_project, methods=['DELETE']),
+    Route('/assign_task_to_project/{project_id}', assign_task_to_project, methods=['POST']),
+    Route('/interns', interns, methods=['GET']),
+    Route('/delete_task/{task_id}', delete_task, methods=['DELETE']),
+    Route('/update_task/{task_id}', update_task, methods=['PUT']),
+    Route('/get_task/{task_id}', get_task, methods=['GET']),
+    Route('/search', search_endpoint, methods=['GET']),
+    Route('/stats/projects', project_stats, methods=['GET']),
+    Route('/stats/interns', intern_stats, methods=['GET']),
+    Route('/audit', audit_log, methods=['GET']),
+    Route('/events', events_endpoint, methods=['GET']),
+]
+
+
+@asynccontextmanager
+async def lifespan(app):
+    try:
+        watcher = await start_events()
+    except Exception as e:
+        logger.error(f"Failed to start event source: {e}")
+        watcher = None
+    yield
+    if watcher is not None:
+        watcher.cancel()
+
+
+app = Starlette(routes=routes, lifespan=lifespan, middleware=[
+    Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*']),
+    Middleware(GZipMiddleware, minimum_size=http_cache.COMPRESS_MIN_SIZE, compresslevel=http_cache.COMPRESS_LEVEL),
+])
@@ -0,0 +1,338 @@
+"""API için yük testi ve mikro benchmark aracı.
+
+Sentetik bir veri seti oluşturur, senaryoları uygulamanın kendisine (Flask test
+istemcisi üzerinden, ağ olmadan) karşı çalıştırır ve uç nokta bazında
+p50/p95/p99 gecikme, verim ve istek başına Mongo komut sayısını raporlar.
+
+Kullanım:
+    python benchmark.py                                  # mongomock ile, varsayılan veri seti
+    python benchmark.py --mongo-uri mongodb://localhost:27017/ --users 2000
+    python benchmark.py --scenarios dashboard,drag_storm --requests 500 --concurrency 16
+    python benchmark.py --save-baseline baseline.json    # sonuçları kaydet
+    python benchmark.py --compare baseline.json          # %20'den fazla kötüleşmede çıkış kodu 1
+
+Gerçek bir mongod verildiğinde `--db-name` altındaki veritabanı her çalıştırmada
+silinip yeniden oluşturulur; üretim veritabanını vermeyin.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# Giriş denemesi sınırları benchmark'ı 429'a düşürmesin; app içe aktarılmadan önce ayarlanmalı
+os.environ.setdefault('LOGIN_ATTEMPTS_PER_EMAIL', str(10 ** 9))
+os.environ.setdefault('LOGIN_ATTEMPTS_PER_IP', str(10 ** 9))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+import bcrypt
+from bson import ObjectId
+from pymongo import monitoring
+
+SCENARIOS = ['login_burst', 'dashboard', 'drag_storm', 'project_list', 'search']
+STATUSES = ['todo', 'test', 'done']
+PASSWORD = 'benchmark'
+
+_current = threading.local()
+
+
+class QueryCounter:
+    """Uç nokta başına Mongo komutlarını sayar; etiket o anki isteğin thread'inden okunur."""
+
+    def __init__(self):
+        self.counts = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self):
+        label = getattr(_current, 'endpoint', None)
+        if label:
+            with self._lock:
+                self.counts[label] += 1
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self, counter):
+        self.counter = counter
+
+    def started(self, event):
+        self.counter.record()
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def patch_mongomock(counter):
+    # mongomock komut olayları üretmediği için koleksiyon metotları sarılır
+    import mongomock
+
+    for name in ['find', 'find_one', 'insert_one', 'insert_many', 'update_one', 'update_many',
+                 'replace_one', 'delete_one', 'delete_many', 'aggregate', 'bulk_write',
+                 'count_documents', 'find_one_and_update']:
+        original = getattr(mongomock.Collection, name)
+
+        def wrapper(self, *args, _original=original, **kwargs):
+            # mongomock bazı metotları birbirine devreder (find_one -> find); yalnızca dış çağrı sayılır
+            if getattr(_current, 'in_mongo', False):
+                return _original(self, *args, **kwargs)
+            counter.record()
+            _current.in_mongo = True
+            try:
+                return _original(self, *args, **kwargs)
+            finally:
+                _current.in_mongo = False
+
+        setattr(mongomock.Collection, name, wrapper)
+
+
+def propagate_labels(executor):
+    # /dashboard sorgularını kendi thread havuzunda çalıştırır; etiket o thread'lere taşınır
+    original = executor.submit
+
+    def submit(fn, *args, **kwargs):
+        label = getattr(_current, 'endpoint', None)
+
+        def run():
+            _current.endpoint = label
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _current.endpoint = None
+
+        return original(run)
+
+    executor.submit = submit
+
+
+def connect(app_module, args, counter):
+    if args.mongo_uri:
+        from pymongo import MongoClient
+        client = MongoClient(args.mongo_uri, event_listeners=[CommandCounter(counter)])
+        client.drop_database(args.db_name)
+    else:
+        import mongomock
+        patch_mongomock(counter)
+        client = mongomock.MongoClient()
+    app_module.client = client
+    app_module.db = client[args.db_name]
+    app_module.ensure_indexes()
+    propagate_labels(app_module.dashboard_executor)
+    return app_module.db
+
+
+def seed(db, args, rng):
+    hashed = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(args.bcrypt_rounds))
+    admins = [f"admin{i}@bench.local" for i in range(max(1, args.users // 50))]
+    interns = [f"intern{i}@bench.local" for i in range(args.users)]
+
+    users = [{"email": email, "password": hashed, "name": "Admin", "surname": str(i), "role": "admin",
+              "profile_picture": None} for i, email in enumerate(admins)]
+    users += [{"email": email, "password": hashed, "name": "Intern", "surname": str(i), "role": "intern",
+               "school": "Bench University", "department": "CS", "profile_picture": None}
+              for i, email in enumerate(interns)]
+    db.users.insert_many(users)
+
+    projects = [{"_id": ObjectId(), "project_name": f"Project {i}", "description": "Synthetic project",
+                 "status": "active"} for i in range(args.projects)]
+    db.projects.insert_many(projects)
+    project_ids = [str(project["_id"]) for project in projects]
+
+    tasks = []
+    for email in interns:
+        for n in range(args.tasks_per_user):
+            tasks.append({"_id": str(ObjectId()), "header": f"Task {n}", "details": "Synthetic task",
+                          "status": rng.choice(STATUSES), "owner": email,
+                          "project_id": rng.choice(project_ids)})
+    for start in range(0, len(tasks), 1000):
+        db.tasks.insert_many(tasks[start:start + 1000])
+
+    # Veri doğrudan yazıldığı için sayaçlar ve arama indeksi baştan kurulur
+    import search
+    import stats
+    stats.rebuild(db)
+    search.reindex(db)
+
+    return admins, interns, tasks
+
+
+def build_scenarios(app_module, admins, interns, tasks, rng):
+    from flask_jwt_extended import create_access_token
+
+    with app_module.app.app_context():
+        tokens = {email: create_access_token(identity=email, additional_claims={"role": role})
+                  for emails, role in [(admins, 'admin'), (interns, 'intern')] for email in emails}
+
+    def auth(email):
+        return {"Authorization": f"Bearer {tokens[email]}"}
+
+    def login_burst(client):
+        email = rng.choice(interns)
+        return [('POST /login', lambda: client.post('/login', json={"email": email, "password": PASSWORD}))]
+
+    def dashboard(client):
+        email = rng.choice(interns + admins)
+        return [('GET /dashboard', lambda: client.get('/dashboard', headers=auth(email)))]
+
+    def drag_storm(client):
+        # Aynı duruma taşımak 404 döndüğü için görev her seferinde bir sonraki sütuna sürüklenir
+        task = rng.choice(tasks)
+        status = STATUSES[(STATUSES.index(task["status"]) + 1) % len(STATUSES)]
+        task["status"] = status
+        return [('PUT /update_task_status', lambda: client.put(
+            '/update_task_status', json={"task_id": task["_id"], "status": status}, headers=auth(task["owner"])))]
+
+    def project_list(client):
+        headers = auth(rng.choice(admins))
+        steps = [('GET /get_projects', lambda: client.get('/get_projects', headers=headers))]
+
+        def fan_out():
+            response = client.get('/get_projects', headers=headers)
+            ids = [project["_id"] for project in response.get_json()["items"]]
+            return client.post('/project_tasks/batch', json={"project_ids": ids}, headers=headers)
+
+        steps.append(('POST /project_tasks/batch', fan_out))
+        steps.append(('GET /get_user_names', lambda: client.get('/get_user_names', headers=headers)))
+        return steps
+
+    def type_ahead(client):
+        # Kullanıcının yazdığı gibi önek önek aranır: "pr", "pro", "proj", ...
+        word = rng.choice(['project', 'intern', 'synthetic', 'task'])
+        headers = auth(rng.choice(interns + admins))
+        return [('GET /search', lambda n=n: client.get('/search', query_string={"q": word[:n]}, headers=headers))
+                for n in range(2, len(word) + 1)]
+
+    return {'login_burst': login_burst, 'dashboard': dashboard,
+            'drag_storm': drag_storm, 'project_list': project_list, 'search': type_ahead}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run_scenario(app_module, builder, counter, requests, concurrency):
+    counter.counts.clear()
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    local = threading.local()
+
+    def one(_):
+        if not hasattr(local, 'client'):
+            local.client = app_module.app.test_client()
+        for label, call in builder(local.client):
+            _current.endpoint = label
+            started = time.perf_counter()
+            response = call()
+            elapsed = (time.perf_counter() - started) * 1000
+            _current.endpoint = None
+            with lock:
+                latencies[label].append(elapsed)
+                if response.status_code >= 400:
+                    errors[label] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(requests)))
+    wall = time.perf_counter() - started
+
+    results = {}
+    for label, values in latencies.items():
+        results[label] = {
+            "requests": len(values),
+            "errors": errors[label],
+            "p50_ms": round(percentile(values, 50), 3),
+            "p95_ms": round(percentile(values, 95), 3),
+            "p99_ms": round(percentile(values, 99), 3),
+            "throughput_rps": round(len(values) / wall, 2) if wall else 0.0,
+            "mongo_ops_per_request": round(counter.counts[label] / len(values), 2),
+        }
+    return results
+
+
+def print_report(results):
+    header = f"{'endpoint':<30}{'reqs':>7}{'errs':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'mongo/req':>11}"
+    print(header)
+    print('-' * len(header))
+    for scenario, endpoints in results.items():
+        print(f"[{scenario}]")
+        for label, r in endpoints.items():
+            print(f"{label:<30}{r['requests']:>7}{r['errors']:>6}{r['p50_ms']:>10}{r['p95_ms']:>10}"
+                  f"{r['p99_ms']:>10}{r['throughput_rps']:>10}{r['mongo_ops_per_request']:>11}")
+
+
+def compare(results, baseline, threshold):
+    """Baseline'a göre p95 veya Mongo komut sayısı threshold'dan fazla artan uç noktaları döner."""
+    regressions = []
+    for scenario, endpoints in results.items():
+        for label, current in endpoints.items():
+            previous = baseline.get(scenario, {}).get(label)
+            if not previous:
+                continue
+            for metric in ['p95_ms', 'mongo_ops_per_request']:
+                if previous[metric] and current[metric] > previous[metric] * (1 + threshold):
+                    regressions.append(f"{scenario} {label} {metric}: {previous[metric]} -> {current[metric]}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the internship management API")
+    parser.add_argument('--mongo-uri', help="Local mongod to use instead of the in-process mongomock backend")
+    parser.add_argument('--db-name', default='intern_management_benchmark')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--projects', type=int, default=20)
+    parser.add_argument('--tasks-per-user', type=int, default=10)
+    parser.add_argument('--bcrypt-rounds', type=int, default=int(os.environ.get('BCRYPT_ROUNDS', 12)))
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--requests', type=int, default=200, help="Iterations per scenario")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--save-baseline')
+    parser.add_argument('--compare')
+    parser.add_argument('--threshold', type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    os.environ['BCRYPT_ROUNDS'] = str(args.bcrypt_rounds)
+    import app as app_module
+
+    rng = random.Random(args.seed)
+    counter = QueryCounter()
+    db = connect(app_module, args, counter)
+    admins, interns, tasks = seed(db, args, rng)
+    builders = build_scenarios(app_module, admins, interns, tasks, rng)
+
+    results = {}
+    for name in [name.strip() for name in args.scenarios.split(',') if name.strip()]:
+        if name not in builders:
+            parser.error(f"Unknown scenario: {name}")
+        results[name] = run_scenario(app_module, builders[name], counter, args.requests, args.concurrency)
+
+    print_report(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,354 @@
+"""Flask (app.py) ve ASGI (asgi.py) sürümlerinin uyumluluk kontrolü.
+
+Aynı senaryo listesi iki uygulamaya da, her seferinde boş bir veritabanıyla
+başlayarak, ağ olmadan (Flask test istemcisi ve Starlette TestClient) çalıştırılır.
+Her adımın durum kodu, JSON gövdesi ve önbellek başlıkları karşılaştırılır;
+üretilen id'ler, token'lar ve zaman damgaları karşılaştırmadan önce
+normalleştirilir. Arka plan işleri her iki sürümde de aynı JobQueue ile işlenir,
+gönderilen bildirimler de karşılaştırılır.
+
+Kullanım:
+    python compat_check.py                                   # mongomock + mongomock_motor ile
+    python compat_check.py --mongo-uri mongodb://localhost:27017/
+    python compat_check.py --verbose                         # her adımı yazdır
+
+Gerçek bir mongod verildiğinde `--db-name` altındaki veritabanı her çalıştırmada
+silinip yeniden oluşturulur. Farklılık varsa çıkış kodu 1.
+"""
+import argparse
+import io
+import json
+import os
+import re
+import sys
+from urllib.parse import urlsplit
+
+# Senaryo hızlı çalışsın ve revizyon önbelleği iki çalıştırma arasında taşınmasın; içe aktarmadan önce
+os.environ.setdefault('BCRYPT_ROUNDS', '4')
+os.environ.setdefault('LOGIN_ATTEMPTS_PER_EMAIL', str(10 ** 9))
+os.environ.setdefault('LOGIN_ATTEMPTS_PER_IP', str(10 ** 9))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ['REVISION_TTL'] = '0'
+# Olaylar süreç içinde dağıtılır; mongomock change stream ve capped koleksiyon desteklemez
+os.environ.setdefault('EVENTS_SOURCE', 'local')
+
+PASSWORD = 'compat-password'
+ADMIN = 'admin@compat.local'
+INTERN = 'intern1@compat.local'
+OTHER_INTERN = 'intern2@compat.local'
+
+# Karşılaştırmada değeri değil yalnızca varlığı önemli olan alanlar
+VOLATILE_KEYS = {'access_token', 'at'}
+_OBJECT_ID = re.compile(r'\b[0-9a-f]{24}\b')
+# Test istemcilerinin sunucu adları farklı (localhost / testserver); URL'lerin yalnızca yolu karşılaştırılır
+_URL = re.compile(r'^https?://[^/]+(/[^?]*)(\?.*)?$')
+
+
+def user(email, name, role):
+    return {"email": email, "password": PASSWORD, "name": name, "surname": "Compat", "role": role,
+            "school": "Ege Üniversitesi", "department": "Bilgisayar"}
+
+
+def task(header, project, owner, status='todo'):
+    return {"header": header, "details": f"{header} ayrıntıları", "status": status,
+            "project_id": f"{{{project}}}", "owner": owner}
+
+
+def picture():
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (256, 256), (200, 30, 30)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+PROFILE_FORM = {"name": "Ayşe", "surname": "Compat", "phone": "5550000000", "school": "Ege Üniversitesi",
+                "department": "Bilgisayar", "gender": "female", "birthdate": "2001-01-01"}
+
+# (ad, metot, yol, token sahibi, gövde, ek seçenekler)
+# Seçenekler: save={değişken: "json.yolu" | "header:Ad" | "path:json.yolu"}, headers={...},
+# form={...} ve files={alan: (dosya adı, içerik)} (gövde yerine multipart), run_jobs=True,
+# flask_only=True (yalnızca Flask'ta sunulan yol: Flask 404 dönmemeli, ASGI 404 dönmeli)
+SCENARIOS = [
+    ('register admin', 'POST', '/register', None, user(ADMIN, 'Ayşe', 'admin'), {}),
+    ('register intern', 'POST', '/register', None, user(INTERN, 'Mehmet', 'intern'), {}),
+    ('register other intern', 'POST', '/register', None, user(OTHER_INTERN, 'Işıl', 'intern'), {}),
+    ('register duplicate', 'POST', '/register', None, user(INTERN, 'Mehmet', 'intern'), {}),
+    ('register missing fields', 'POST', '/register', None, {"email": "x@compat.local"}, {}),
+    ('register bad role', 'POST', '/register', None, user('x@compat.local', 'X', 'boss'), {}),
+    ('login admin', 'POST', '/login', None, {"email": ADMIN, "password": PASSWORD}, {"save": {ADMIN: "access_token"}}),
+    ('login intern', 'POST', '/login', None, {"email": INTERN, "password": PASSWORD}, {"save": {INTERN: "access_token"}}),
+    ('login wrong password', 'POST', '/login', None, {"email": INTERN, "password": "wrong"}, {}),
+    ('login missing fields', 'POST', '/login', None, {"email": INTERN}, {}),
+    ('protected without token', 'GET', '/protected', None, None, {}),
+    ('protected with bad token', 'GET', '/protected', None, None, {"headers": {"Authorization": "Bearer not.a.token"}}),
+    ('protected', 'GET', '/protected', INTERN, None, {}),
+    ('profile', 'GET', '/profile', ADMIN, None, {}),
+    ('update profile', 'PUT', '/profile', ADMIN, None, {"form": PROFILE_FORM, "files": {"profile_picture": ("avatar.png", picture())}}),
+    ('update profile bad picture', 'PUT', '/profile', ADMIN, None, {"form": PROFILE_FORM, "files": {"profile_picture": ("avatar.exe", b"MZ")}}),
+    ('update profile not an image', 'PUT', '/profile', ADMIN, None, {"form": PROFILE_FORM, "files": {"profile_picture": ("avatar.png", b"not a png")}}),
+    ('profile after update', 'GET', '/profile', ADMIN, None, {"save": {"picture": "path:profile_picture"}}),
+    ('profile picture', 'GET', '{picture}', None, None, {"save": {"picture_etag": "header:ETag"}}),
+    ('profile picture not modified', 'GET', '{picture}', None, None, {"headers": {"If-None-Match": "{picture_etag}"}}),
+    ('profile picture thumbnail', 'GET', '{picture}&size=thumb', None, None, {}),
+    ('profile picture invalid id', 'GET', '/profile/picture/nope', None, None, {}),
+    ('search updated user', 'GET', '/search?q=ayse&type=user', ADMIN, None, {}),
+    ('events without token', 'GET', '/events', None, None, {}),
+    ('events with bad token', 'GET', '/events?token=not.a.token', None, None, {}),
+    ('events with basic auth', 'GET', '/events', None, None, {"headers": {"Authorization": "Basic x"}}),
+
+    ('add project', 'POST', '/add_project', ADMIN, {"project_name": "Staj Portalı", "description": "Görev takibi", "status": "active"}, {}),
+    ('add second project', 'POST', '/add_project', ADMIN, {"project_name": "Raporlama", "description": "Haftalık rapor", "status": "planned"}, {}),
+    ('add project as intern', 'POST', '/add_project', INTERN, {"project_name": "X", "description": "X", "status": "x"}, {}),
+    ('add project missing fields', 'POST', '/add_project', ADMIN, {"project_name": "X"}, {}),
+    ('get projects', 'GET', '/get_projects', ADMIN, None, {"save": {"project": "items.0._id", "second_project": "items.1._id", "projects_etag": "header:ETag"}}),
+    ('get projects not modified', 'GET', '/get_projects', ADMIN, None, {"headers": {"If-None-Match": "{projects_etag}"}}),
+    ('get projects by status', 'GET', '/get_projects?status=planned&fields=project_name', ADMIN, None, {}),
+
+    ('add task', 'POST', '/addTask', ADMIN, task('Görev ekranı', 'project', INTERN), {"save": {"task": "task_id"}}),
+    ('add second task', 'POST', '/addTask', ADMIN, task('Giriş sayfası', 'project', INTERN, 'test'), {"save": {"second_task": "task_id"}}),
+    ('add third task', 'POST', '/addTask', ADMIN, task('Rapor şablonu', 'second_project', OTHER_INTERN), {"save": {"third_task": "task_id"}}),
+    ('add task missing fields', 'POST', '/addTask', ADMIN, {"header": "X"}, {}),
+    ('add task as intern', 'POST', '/addTask', INTERN, task('X', 'project', INTERN), {}),
+    ('get task', 'GET', '/get_task/{task}', INTERN, None, {"save": {"task_etag": "header:ETag"}}),
+    ('get task not modified', 'GET', '/get_task/{task}', INTERN, None, {"headers": {"If-None-Match": "{task_etag}"}}),
+    ('get missing task', 'GET', '/get_task/nope', INTERN, None, {}),
+
+    ('admin tasks', 'GET', '/tasks', ADMIN, None, {}),
+    ('intern tasks', 'GET', '/tasks', INTERN, None, {}),
+    ('tasks first page', 'GET', '/tasks?limit=1&fields=header,status', ADMIN, None, {"save": {"cursor": "next_cursor"}}),
+    ('tasks second page', 'GET', '/tasks?limit=1&fields=header,status&after={cursor}', ADMIN, None, {}),
+    ('tasks by status', 'GET', '/tasks?status=test', ADMIN, None, {}),
+    ('tasks bad limit', 'GET', '/tasks?limit=abc', ADMIN, None, {}),
+    ('tasks zero limit', 'GET', '/tasks?limit=0', ADMIN, None, {}),
+    ('tasks unknown field', 'GET', '/tasks?fields=header,salary', ADMIN, None, {}),
+    ('projects bad cursor', 'GET', '/get_projects?after=nope', ADMIN, None, {}),
+
+    ('update task status', 'PUT', '/update_task_status', INTERN, {"task_id": "{task}", "status": "test"}, {}),
+    ('update task status unchanged', 'PUT', '/update_task_status', INTERN, {"task_id": "{task}", "status": "test"}, {}),
+    ('update task status missing', 'PUT', '/update_task_status', INTERN, {"task_id": "{task}"}, {}),
+    ('update task', 'PUT', '/update_task/{second_task}', ADMIN, dict(task('Giriş sayfası v2', 'project', OTHER_INTERN, 'done')), {}),
+    ('update missing task', 'PUT', '/update_task/nope', ADMIN, task('X', 'project', INTERN), {}),
+    ('assign task to project', 'POST', '/assign_task_to_project/{second_project}', INTERN, {"task_id": "{task}"}, {}),
+    ('assign missing task', 'POST', '/assign_task_to_project/{second_project}', INTERN, {"task_id": "nope"}, {}),
+    ('project tasks', 'GET', '/get_project_tasks/{second_project}', INTERN, None, {}),
+    ('batch project tasks', 'POST', '/project_tasks/batch', INTERN, {"project_ids": ["{project}", "{second_project}", "unknown"]}, {}),
+    ('batch project tasks empty', 'POST', '/project_tasks/batch', INTERN, {"project_ids": []}, {}),
+    ('batch project tasks list body', 'POST', '/project_tasks/batch', INTERN, ["{project}"], {}),
+    ('batch project tasks bad id', 'POST', '/project_tasks/batch', INTERN, {"project_ids": [{"$ne": None}]}, {}),
+
+    ('user names', 'GET', '/get_user_names', INTERN, None, {}),
+    ('interns', 'GET', '/interns', ADMIN, None, {}),
+    ('interns with fields', 'GET', '/interns?fields=email,school,department', ADMIN, None, {}),
+    ('admin dashboard', 'GET', '/dashboard', ADMIN, None, {"save": {"dashboard_etag": "header:ETag"}}),
+    ('admin dashboard not modified', 'GET', '/dashboard', ADMIN, None, {"headers": {"If-None-Match": "{dashboard_etag}"}}),
+    ('intern dashboard', 'GET', '/dashboard', INTERN, None, {}),
+
+    ('search', 'GET', '/search?q=gor', ADMIN, None, {}),
+    ('search accents', 'GET', '/search?q=ışı', ADMIN, None, {}),
+    ('search by type', 'GET', '/search?q=rap&type=project,task', ADMIN, None, {}),
+    ('intern search', 'GET', '/search?q=rap', INTERN, None, {}),
+    ('search missing query', 'GET', '/search', ADMIN, None, {}),
+    ('search unknown type', 'GET', '/search?q=rap&type=invoice', ADMIN, None, {}),
+    ('project stats', 'GET', '/stats/projects', ADMIN, None, {}),
+    ('admin intern stats', 'GET', '/stats/interns', ADMIN, None, {}),
+    ('intern stats', 'GET', '/stats/interns', INTERN, None, {}),
+
+    ('delete task', 'DELETE', '/delete_task/{third_task}', ADMIN, None, {}),
+    ('delete missing task', 'DELETE', '/delete_task/{third_task}', ADMIN, None, {}),
+    ('stats after delete', 'GET', '/stats/projects?project_ids={second_project}', ADMIN, None, {}),
+    ('update project', 'PUT', '/update_project/{second_project}', ADMIN, {"project_name": "Raporlama 2", "description": "Aylık rapor", "status": "active"}, {}),
+    ('update project invalid id', 'PUT', '/update_project/nope', ADMIN, {"project_name": "X", "description": "X", "status": "x"}, {}),
+    ('delete project', 'DELETE', '/delete_project/{second_project}', ADMIN, None, {}),
+    ('delete missing project', 'DELETE', '/delete_project/{second_project}', ADMIN, None, {}),
+    ('projects after delete', 'GET', '/get_projects', INTERN, None, {}),
+
+    ('audit log', 'GET', '/audit?actor=' + ADMIN, ADMIN, None, {"run_jobs": True}),
+    ('audit log as intern', 'GET', '/audit', INTERN, None, {}),
+
+    # asgi.py belge açıklamasındaki yalnızca Flask'ta kalan yollar
+    ('bulk tasks', 'POST', '/tasks/bulk', ADMIN, {"operations": []}, {"flask_only": True}),
+    ('admin import', 'POST', '/admin/import', ADMIN, None, {"flask_only": True}),
+    ('admin export', 'GET', '/admin/export', ADMIN, None, {"flask_only": True}),
+    ('metrics', 'GET', '/metrics', None, None, {"flask_only": True}),
+    ('cache stats', 'GET', '/cache_stats', ADMIN, None, {"flask_only": True}),
+]
+FLASK_ONLY_STEPS = {step for step, _, _, _, _, options in SCENARIOS if options.get("flask_only")}
+
+
+class ListSender:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, recipient, subject, body):
+        self.sent.append({"to": recipient, "subject": subject, "body": body})
+
+
+def lookup(document, path):
+    for part in path.split('.'):
+        if document is None:
+            return None
+        document = document[int(part)] if isinstance(document, list) else document.get(part)
+    return document
+
+
+def fill(value, variables):
+    """Gövde ve yollardaki {değişken} yer tutucularını önceki adımlarda kaydedilen değerlerle doldurur."""
+    if isinstance(value, str):
+        return re.sub(r'\{(\w+)\}', lambda m: str(variables.get(m.group(1), m.group(0))), value)
+    if isinstance(value, list):
+        return [fill(item, variables) for item in value]
+    if isinstance(value, dict):
+        return {key: fill(item, variables) for key, item in value.items()}
+    return value
+
+
+def normalize(value, key=None):
+    if key in VOLATILE_KEYS and value is not None:
+        return f"<{key}>"
+    if isinstance(value, str):
+        url = _URL.match(value)
+        if url:
+            value = f"<base>{url.group(1)}"
+        return _OBJECT_ID.sub("<id>", value)
+    if isinstance(value, list):
+        return [normalize(item) for item in value]
+    if isinstance(value, dict):
+        return {normalize(name): normalize(item, name) for name, item in value.items()}
+    return value
+
+
+def flask_client(app_module):
+    client = app_module.app.test_client()
+
+    def request(method, path, headers, body, form=None, files=None):
+        if form is not None or files:
+            data = dict(form or {})
+            data.update({field: (io.BytesIO(content), filename) for field, (filename, content) in (files or {}).items()})
+            response = client.open(path, method=method, headers=headers, data=data)
+        else:
+            response = client.open(path, method=method, headers=headers, json=body)
+        return response.status_code, {name.lower(): value for name, value in response.headers.items()}, \
+            response.get_json(silent=True)
+    return request, lambda: None
+
+
+def asgi_client(asgi_module):
+    from starlette.testclient import TestClient
+
+    client = TestClient(asgi_module.app)
+    client.__enter__()
+
+    def request(method, path, headers, body, form=None, files=None):
+        if form is not None or files:
+            response = client.request(method, path, headers=headers, data=form, files=files)
+        else:
+            response = client.request(method, path, headers=headers, json=body)
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+        return response.status_code, {name.lower(): value for name, value in response.headers.items()}, data
+    return request, lambda: client.__exit__(None, None, None)
+
+
+def run(name, make_client, module, module_db, sync_db):
+    """Senaryoları bir uygulamaya karşı çalıştırır; (adım sonuçları, gönderilen bildirimler) döner."""
+    import app as app_module
+    import http_cache
+    import jobs
+
+    sync_db.client.drop_database(sync_db.name)
+    app_module.db = sync_db
+    app_module.ensure_indexes()
+    module.db = module_db
+    # Gövde önbelleği ETag'le anahtarlanır; önceki çalıştırmanın gövdeleri bu çalıştırmaya karışmasın
+    http_cache.body_cache = http_cache.BodyCache(http_cache.HTTP_CACHE_MAX_BYTES)
+
+    queue = jobs.JobQueue(lambda: sync_db)
+    queue.sender = ListSender()
+    request, close = make_client(module)
+    variables = {}
+    results = []
+    try:
+        for step, method, path, token_owner, body, options in SCENARIOS:
+            if options.get("run_jobs"):
+                while queue.work_once(f"compat-{name}"):
+                    pass
+            headers = fill(options.get("headers", {}), variables)
+            if token_owner:
+                headers["Authorization"] = f"Bearer {variables[token_owner]}"
+            status, response_headers, data = request(method, fill(path, variables), headers, fill(body, variables),
+                                                     options.get("form"), options.get("files"))
+            for variable, source in options.get("save", {}).items():
+                if source.startswith('header:'):
+                    variables[variable] = response_headers.get(source[len('header:'):].lower(), '')
+                elif source.startswith('path:'):
+                    url = urlsplit(lookup(data, source[len('path:'):]) or '')
+                    variables[variable] = f"{url.path}?{url.query}" if url.query else url.path
+                else:
+                    variables[variable] = lookup(data, source)
+            results.append((step, {
+                "status": status,
+                "json": normalize(data),
+                "etag": 'etag' in response_headers,
+                "cache_control": response_headers.get('cache-control'),
+            }))
+    finally:
+        close()
+    return results, normalize(sorted(queue.sender.sent, key=lambda sent: (sent["to"], sent["subject"])))
+
+
+def connect(args):
+    if args.mongo_uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        from pymongo import MongoClient
+
+        return MongoClient(args.mongo_uri)[args.db_name], AsyncIOMotorClient(args.mongo_uri)[args.db_name]
+
+    import mongomock
+    from mongomock_motor import AsyncMongoMockClient
+
+    # İki sürüm aynı bellek içi veritabanını görür
+    client = mongomock.MongoClient()
+    return client[args.db_name], AsyncMongoMockClient(mock_mongo_client=client)[args.db_name]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the same scenarios against the Flask and ASGI apps")
+    parser.add_argument('--mongo-uri', help="Local mongod to use instead of mongomock")
+    parser.add_argument('--db-name', default='intern_management_compat')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    import app as app_module
+    import asgi
+
+    sync_db, async_db = connect(args)
+    flask_results, flask_sent = run('flask', flask_client, app_module, sync_db, sync_db)
+    asgi_results, asgi_sent = run('asgi', asgi_client, asgi, async_db, sync_db)
+    if args.mongo_uri:
+        sync_db.client.drop_database(args.db_name)
+
+    differences = 0
+    for (step, expected), (_, actual) in zip(flask_results, asgi_results):
+        if step in FLASK_ONLY_STEPS:
+            same = expected["status"] != 404 and actual["status"] == 404
+        else:
+            same = expected == actual
+        if not same:
+            differences += 1
+            print(f"DIFF {step}\n  flask: {json.dumps(expected, ensure_ascii=False)}\n"
+                  f"  asgi:  {json.dumps(actual, ensure_ascii=False)}")
+        elif args.verbose:
+            print(f"ok   {step}: {expected['status']}")
+    if flask_sent != asgi_sent:
+        differences += 1
+        print(f"DIFF notifications\n  flask: {flask_sent}\n  asgi:  {asgi_sent}")
+
+    print(f"{len(SCENARIOS)} steps, {differences} differences")
+    return 1 if differences else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,285 @@
+"""Görev ve proje değişikliklerini abonelere ileten olay akışı.
+
+Kaynak üç türlüdür:
+  - changestream: Mongo change stream'i (replica set gerekir) her worker'da bir
+    thread tarafından izlenir; böylece tüm worker'lar tüm yazmaları görür.
+  - feed: change stream yoksa (tek mongod) yazma kaynakları (AddTask, UpdateTask, ...)
+    olayları capped `events_feed` koleksiyonuna yazar; her worker koleksiyonu
+    tailable cursor'la izler. Farklı worker'lara (ve ASGI sürecine) bağlı aboneler
+    de tüm olayları alır.
+  - local: olaylar yalnızca süreç içinde dağıtılır; tek süreçli geliştirme içindir,
+    birden çok worker'da olayların çoğu kaybolur.
+
+EVENTS_SOURCE=auto (varsayılan) önce change stream'i, sonra feed'i dener, ikisi de
+olmazsa local'e düşer. Aboneler `GET /events` üzerinden Server-Sent Events olarak beslenir;
+ASGI sürümü (asgi.py) aynı kaynakları Motor ile izler ve AsyncSubscriber kullanır.
+"""
+import asyncio
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+EVENTS_SOURCE = os.environ.get('EVENTS_SOURCE', 'auto')  # auto, changestream, feed, local
+EVENTS_QUEUE_SIZE = int(os.environ.get('EVENTS_QUEUE_SIZE', 1000))
+EVENTS_MAX_SUBSCRIBERS = int(os.environ.get('EVENTS_MAX_SUBSCRIBERS', 1000))
+EVENTS_HEARTBEAT_SECONDS = int(os.environ.get('EVENTS_HEARTBEAT_SECONDS', 15))
+EVENTS_FEED_BYTES = int(os.environ.get('EVENTS_FEED_BYTES', 16 * 1024 * 1024))
+FEED_COLLECTION = 'events_feed'
+
+KEEPALIVE = ": keepalive\n\n"
+
+WATCHED_COLLECTIONS = {'tasks': 'task', 'projects': 'project'}
+CHANGE_TYPES = {'insert': 'created', 'update': 'updated', 'replace': 'updated', 'delete': 'deleted'}
+
+logger = logging.getLogger('events')
+
+
+class Subscriber:
+    def __init__(self, email, role, project_ids):
+        self.email = email
+        self.role = role
+        self.project_ids = set(project_ids)
+        self.queue = queue.Queue(maxsize=EVENTS_QUEUE_SIZE)
+        self.lagging = False
+
+    def wants(self, event):
+        if self.role == 'admin' or event["type"].startswith('project.'):
+            return True
+        owner = event.get("owner")
+        if owner == self.email:
+            # Yeni bir projede görev alan stajyer o projenin olaylarını da görmeye başlar
+            if event.get("project_id"):
+                self.project_ids.add(event["project_id"])
+            return True
+        if event.get("previous_owner") == self.email:
+            return True
+        if owner is None and event["type"] == 'task.deleted':
+            # Change stream silmelerinde sahip bilgisi yok; yalnızca id gönderilir
+            return True
+        return event.get("project_id") in self.project_ids
+
+    def offer(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            # Yetişemeyen istemci olayları kaçırdı; tam listeyi yeniden çekmesi istenir
+            self.lagging = True
+
+    def clear(self):
+        with self.queue.mutex:
+            self.queue.queue.clear()
+
+
+class AsyncSubscriber(Subscriber):
+    """Olay döngüsünde dağıtılan ve beklenen abone; dispatch aynı döngüden çağrılmalıdır."""
+
+    def __init__(self, email, role, project_ids):
+        super().__init__(email, role, project_ids)
+        self.queue = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE)
+
+    def offer(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.lagging = True
+
+    def clear(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+
+class EventBroker:
+    def __init__(self):
+        self.source = 'local'
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._feed = None
+        self._stopped = threading.Event()
+
+    def start(self, db, source=None):
+        """Kaynağı seçer; changestream ya da feed kullanılabiliyorsa izleme thread'ini başlatır."""
+        source = source or EVENTS_SOURCE
+        self.stop()
+        self._stopped = threading.Event()
+        self.source = 'local'
+        self._feed = None
+        if source == 'local':
+            return self.source
+
+        if source in ('auto', 'changestream'):
+            try:
+                stream = db.watch(change_pipeline(), full_document='updateLookup', max_await_time_ms=1000)
+            except PyMongoError as e:
+                if source == 'changestream':
+                    raise
+                logger.info(f"Change streams unavailable, using the {FEED_COLLECTION} collection: {e}")
+            else:
+                self.source = 'changestream'
+                self._start_thread(self._watch, db, stream)
+                return self.source
+
+        try:
+            feed, last_id = open_feed(db)
+        except PyMongoError as e:
+            if source == 'feed':
+                raise
+            logger.warning(f"Event feed unavailable, using in-process events only: {e}")
+            return self.source
+
+        self.source = 'feed'
+        self._feed = feed
+        self._start_thread(self._tail, feed, last_id)
+        return self.source
+
+    def _start_thread(self, target, *args):
+        self._watcher = threading.Thread(target=target, args=args + (self._stopped,),
+                                         name="events-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._watcher = None
+
+    def subscribe(self, email, role, project_ids, subscriber_class=Subscriber):
+        with self._lock:
+            if len(self._subscribers) >= EVENTS_MAX_SUBSCRIBERS:
+                return None
+            subscriber = subscriber_class(email, role, project_ids)
+            self._subscribers.add(subscriber)
+            return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event):
+        """Yazma kaynaklarından çağrılır; change stream aktifse olay oradan geleceği için yok sayılır."""
+        if self.source == 'feed':
+            try:
+                self._feed.insert_one(feed_document(event))
+                return
+            except PyMongoError as e:
+                # Diğer worker'lar bu olayı kaçırır; en azından bu süreçtekiler alsın
+                logger.error(f"Failed to write event to feed: {e}")
+        if self.source != 'changestream':
+            self.dispatch(event)
+
+    def dispatch(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            if subscriber.wants(event):
+                subscriber.offer(event)
+
+    def stream(self, subscriber):
+        """SSE gövdesi üreten generator; bağlantı kapanınca aboneliği sonlandırır."""
+        try:
+            yield sse('ready', {'source': self.source})
+            while True:
+                if subscriber.lagging:
+                    subscriber.lagging = False
+                    subscriber.clear()
+                    yield sse('resync', {})
+                try:
+                    event = subscriber.queue.get(timeout=EVENTS_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield KEEPALIVE
+                    continue
+                yield sse(event['type'], event)
+        finally:
+            self.unsubscribe(subscriber)
+
+    def _watch(self, db, stream, stopped):
+        resume_token = None
+        while not stopped.is_set():
+            try:
+                if stream is None:
+                    stream = db.watch(change_pipeline(), full_document='updateLookup',
+                                      resume_after=resume_token, max_await_time_ms=1000)
+                with stream:
+                    while stream.alive and not stopped.is_set():
+                        change = stream.try_next()
+                        if change is None:
+                            continue
+                        resume_token = stream.resume_token
+                        self.dispatch(event_from_change(change))
+            except PyMongoError as e:
+                logger.warning(f"Change stream interrupted, retrying: {e}")
+                time.sleep(1)
+            stream = None
+
+    def _tail(self, feed, last_id, stopped):
+        while not stopped.is_set():
+            try:
+                query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+                with feed.find(query, cursor_type=CursorType.TAILABLE_AWAIT, max_await_time_ms=1000) as cursor:
+                    while cursor.alive and not stopped.is_set():
+                        for document in cursor:
+                            last_id = document["_id"]
+                            self.dispatch(document["event"])
+            except PyMongoError as e:
+                logger.warning(f"Event feed interrupted, retrying: {e}")
+            # Boş capped koleksiyonda cursor hemen kapanır; ilk olay gelene kadar yeniden denenir
+            stopped.wait(1)
+
+
+def sse(name, data):
+    return f"event: {name}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def change_pipeline():
+    return [{"$match": {
+        "ns.coll": {"$in": list(WATCHED_COLLECTIONS)},
+        "operationType": {"$in": list(CHANGE_TYPES)}
+    }}]
+
+
+def open_feed(db):
+    """Capped feed koleksiyonunu gerekirse oluşturur; (koleksiyon, son olayın _id'si) döner."""
+    try:
+        db.create_collection(FEED_COLLECTION, capped=True, size=EVENTS_FEED_BYTES)
+    except CollectionInvalid:
+        pass
+    feed = db[FEED_COLLECTION]
+    options = feed.options()
+    if not options.get('capped'):
+        raise CollectionInvalid(f"{FEED_COLLECTION} exists but is not capped")
+    # Açılıştan önceki olaylar yeniden gönderilmez
+    last = feed.find_one({}, {"_id": 1}, sort=[("$natural", -1)])
+    return feed, last["_id"] if last else None
+
+
+def feed_document(event):
+    return {"event": event, "at": time.time()}
+
+
+def event_from_change(change):
+    kind = WATCHED_COLLECTIONS[change["ns"]["coll"]]
+    action = CHANGE_TYPES[change["operationType"]]
+    document = change.get("fullDocument")
+    return make_event(kind, action, str(change["documentKey"]["_id"]), document)
+
+
+def make_event(kind, action, object_id, document=None, previous_owner=None):
+    event = {"type": f"{kind}.{action}", "id": str(object_id)}
+    if document is not None:
+        if kind == 'task':
+            event["owner"] = document.get("owner")
+            event["project_id"] = document.get("project_id")
+        if action != 'deleted':
+            document = dict(document)
+            document["_id"] = str(document["_id"])
+            event["data"] = document
+    if previous_owner is not None:
+        event["previous_owner"] = previous_owner
+    return event
+
+
+broker = EventBroker()
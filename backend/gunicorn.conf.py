@@ -0,0 +1,44 @@
+# Üretim sunucusu ayarları: gunicorn -c gunicorn.conf.py
+import multiprocessing
+import os
+import sys
+import tempfile
+
+wsgi_app = 'app:create_app()'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 0))
+preload_app = os.environ.get('GUNICORN_PRELOAD', '0') == '1'
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+loglevel = os.environ.get('LOG_LEVEL', 'info').lower()
+
+# Her /events bağlantısı bir gthread thread'ini tutar; diğer istekler için en az yarısı boş kalır.
+# En az bir thread her zaman normal isteklere ayrılır: GUNICORN_THREADS=1 iken sınır 0 olur
+# ve /events 503 döner (akış bu tek thread'i kilitleyemez)
+events_max_subscribers = int(os.environ.get('EVENTS_MAX_SUBSCRIBERS', threads // 2))
+os.environ['EVENTS_MAX_SUBSCRIBERS'] = str(max(0, min(events_max_subscribers, threads - 1)))
+if workers > 1 and os.environ.get('EVENTS_SOURCE') == 'local':
+    raise RuntimeError("EVENTS_SOURCE=local only reaches subscribers of one process; "
+                       "use auto, changestream or feed with more than one worker")
+
+# Birden çok worker varken /metrics tüm worker'ların toplamını dönebilsin diye ortak dizin
+if workers > 1:
+    os.environ.setdefault('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'internship-metrics'))
+
+
+def on_starting(server):
+    import instrumentation
+    instrumentation.reset_metrics_dir()
+
+
+def post_worker_init(worker):
+    # Uygulama yüklendikten sonra her worker'da çalışır (preload_app açık ya da kapalı);
+    # Mongo istemcisi, log, olay ve iş thread'leri fork'a güvenli olmadığı için burada kurulur
+    app_module = sys.modules.get('app')
+    if app_module is not None:
+        app_module.init_worker()
@@ -0,0 +1,185 @@
+"""Okuma uç noktaları için ETag, yanıt gövdesi önbelleği ve sıkıştırma.
+
+ETag'ler koleksiyon revizyon sayaçlarından türetilir: yazma kaynakları
+`revisions.bump('projects')` gibi çağrılarla sayacı artırır. Sayaçlar Mongo'daki
+`revisions` koleksiyonunda tutulur (tüm worker'lar aynı değeri görür) ve süreç
+içinde REVISION_TTL saniye önbelleklenir; bu sürede `If-None-Match` istekleri
+Mongo'ya hiç gitmeden 304 ile yanıtlanır. Kendi worker'ındaki yazmalar anında
+görülür, diğer worker'lardaki yazmalar en geç REVISION_TTL sonra.
+"""
+import gzip
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, request
+from pymongo import ReturnDocument
+
+try:
+    import brotli
+except ImportError:  # brotli yoksa yalnızca gzip kullanılır
+    brotli = None
+
+REVISION_TTL = float(os.environ.get('REVISION_TTL', 1.0))
+HTTP_CACHE_MAX_BYTES = int(os.environ.get('HTTP_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))
+COMPRESSIBLE_TYPES = ('application/json', 'text/', 'application/x-ndjson')
+
+logger = logging.getLogger('http_cache')
+
+
+class RevisionTracker:
+    def __init__(self, get_db):
+        self._get_db = get_db
+        self._local = {}
+        self._lock = threading.Lock()
+
+    def get(self, names):
+        now = time.monotonic()
+        with self._lock:
+            cached = [self._local.get(name) for name in names]
+        if all(entry and entry[0] > now for entry in cached):
+            return tuple(entry[1] for entry in cached)
+
+        found = {doc["_id"]: doc.get("rev", 0) for doc in self._get_db().revisions.find({"_id": {"$in": list(names)}})}
+        with self._lock:
+            for name in names:
+                self._local[name] = (now + REVISION_TTL, found.get(name, 0))
+        return tuple(found.get(name, 0) for name in names)
+
+    def bump(self, *names):
+        for name in names:
+            try:
+                doc = self._get_db().revisions.find_one_and_update(
+                    {"_id": name}, {"$inc": {"rev": 1}}, upsert=True, return_document=ReturnDocument.AFTER
+                )
+                with self._lock:
+                    self._local[name] = (time.monotonic() + REVISION_TTL, doc["rev"])
+            except Exception as e:
+                # Sayaç artırılamazsa önbellek en geç TTL sonunda tazelenir; yazma başarısız sayılmaz
+                logger.error(f"Failed to bump revision for {name}: {e}")
+                with self._lock:
+                    self._local.pop(name, None)
+
+
+class BodyCache:
+    """ETag -> JSON gövdesi; toplam boyutu sınırlı LRU."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return body
+
+    def set(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._size, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses}
+
+
+body_cache = BodyCache(HTTP_CACHE_MAX_BYTES)
+
+
+def revision_etag(full_path, versions):
+    # full_path sorgu dizesini de içerir ("/get_projects?limit=10"); ASGI sürümü aynı biçimi üretir
+    return hashlib.sha1(f"{full_path}|{versions}".encode('utf-8')).hexdigest()
+
+
+def cached_response(revisions, *collections):
+    """GET kaynağını koleksiyon revizyonlarına bağlı ETag ve gövde önbelleğiyle sarar.
+
+    Yanıt yalnızca koleksiyon içeriğine ve URL'e bağlı olmalıdır (kullanıcıya göre değişmemeli).
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                versions = revisions.get(collections)
+            except Exception as e:
+                logger.error(f"Failed to read revisions: {e}")
+                return fn(*args, **kwargs)
+
+            etag = revision_etag(request.full_path, versions)
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                body = body_cache.get(etag)
+                if body is None:
+                    result = fn(*args, **kwargs)
+                    if not isinstance(result, Response) or result.status_code != 200:
+                        return result
+                    body = result.get_data()
+                    body_cache.set(etag, body)
+                response = Response(body, mimetype='application/json')
+
+            # Gövde sıkıştırılabileceği için zayıf ETag; istemci her seferinde doğrular
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
+
+
+def choose_encoding(accept_encoding):
+    if brotli is not None and 'br' in accept_encoding:
+        return 'br'
+    if 'gzip' in accept_encoding:
+        return 'gzip'
+    return None
+
+
+def init_app(app):
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code != 200 or response.is_streamed or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or not (response.mimetype or '').startswith(COMPRESSIBLE_TYPES)):
+            return response
+
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+        if encoding is None:
+            return response
+        body = response.get_data()
+        if len(body) < COMPRESS_MIN_SIZE:
+            return response
+
+        if encoding == 'br':
+            compressed = brotli.compress(body, quality=min(COMPRESS_LEVEL, 11))
+        else:
+            compressed = gzip.compress(body, compresslevel=COMPRESS_LEVEL)
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        return response
+
+    return app
@@ -0,0 +1,168 @@
+"""Koleksiyon indekslerinin tek kaynağı ve sorgu planı kontrolü.
+
+INDEXES her kaynağın sorgularını destekleyen indeksleri tanımlar; `ensure(db)`
+bunları adıyla oluşturur. create_index aynı tanım için bir şey yapmadığından
+her açılışta güvenle çalıştırılabilir. Komut satırından:
+
+    python indexes.py apply                       # MONGO_URI'deki veritabanına uygula
+    python indexes.py check --mongo-uri mongodb://localhost:27017/
+                                                  # geçici veritabanı kurar, örnek veriyle
+                                                  # her kaynağın sorgusunu explain eder;
+                                                  # COLLSCAN varsa çıkış kodu 1
+
+`check` gerçek bir mongod ister (mongomock explain desteklemez) ve
+`--db-name` ile verilen veritabanını silip yeniden oluşturur.
+"""
+import argparse
+import logging
+import sys
+
+from bson import ObjectId
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+# (koleksiyon, anahtarlar, seçenekler); seçeneklerde name zorunlu
+INDEXES = [
+    # Giriş, admin_required, profil: e-postayla tek kullanıcı; tekrar eden kayıt da engellenir
+    ('users', [("email", ASCENDING)], {"name": "email_unique", "unique": True}),
+    # Interns: role filtresi + _id üzerinden sayfalama
+    ('users', [("role", ASCENDING), ("_id", ASCENDING)], {"name": "role_id"}),
+    # GetProjectTasks, BatchProjectTasks, proje istatistikleri
+    ('tasks', [("project_id", ASCENDING), ("status", ASCENDING)], {"name": "project_id_status"}),
+    # UserTasks, Dashboard (stajyer), stajyer istatistikleri
+    ('tasks', [("owner", ASCENDING), ("status", ASCENDING)], {"name": "owner_status"}),
+    # GetProjects?status=
+    ('projects', [("status", ASCENDING), ("_id", ASCENDING)], {"name": "status_id"}),
+    ('stats', [("kind", ASCENDING), ("_id", ASCENDING)], {"name": "kind_id"}),
+    ('search', [("terms", ASCENDING)], {"name": "terms"}),
+    # Arama adayları önce başlık eşleşmelerinden toplanır
+    ('search', [("title_words", ASCENDING)], {"name": "title_words"}),
+    ('search', [("title_terms", ASCENDING)], {"name": "title_terms"}),
+    # İşçilerin hazır iş sorgusu; audit geçmişi nesne ve kişiye göre okunur
+    ('jobs', [("type", ASCENDING), ("state", ASCENDING), ("run_at", ASCENDING)], {"name": "type_state_run_at"}),
+    ('audit_log', [("object_id", ASCENDING), ("_id", ASCENDING)], {"name": "object_id_id"}),
+    ('audit_log', [("actor", ASCENDING), ("_id", ASCENDING)], {"name": "actor_id"}),
+    # Giriş denemesi sayaçları pencere bitince TTL ile silinir
+    ('login_attempts', [("expires_at", ASCENDING)], {"name": "expires_at_ttl", "expireAfterSeconds": 0}),
+]
+
+logger = logging.getLogger('indexes')
+
+
+def ensure(db):
+    """Tanımlı indeksleri oluşturur; oluşturulamayanları (koleksiyon, ad, hata) listesi olarak döner."""
+    failures = []
+    for collection, keys, options in INDEXES:
+        try:
+            db[collection].create_index(keys, **options)
+        except DuplicateKeyError as e:
+            failures.append((collection, options["name"], f"duplicate values must be removed first: {e}"))
+        except OperationFailure as e:
+            # Aynı adla farklı tanımlı eski bir indeks varsa elle silinmesi gerekir
+            failures.append((collection, options["name"], str(e)))
+    for collection, name, error in failures:
+        logger.error(f"Failed to create index {collection}.{name}: {error}")
+    return failures
+
+
+def canonical_queries(sample):
+    """Her kaynağın en sık çalışan sorgusu: (kaynak, koleksiyon, filtre, sıralama)."""
+    by_id = [("_id", ASCENDING)]
+    return [
+        ('UserLogin', 'users', {"email": sample["email"]}, None),
+        ('Interns', 'users', {"role": "intern"}, by_id),
+        ('GetUserNames', 'users', {}, by_id),
+        ('UserTasks', 'tasks', {"owner": sample["email"]}, by_id),
+        ('GetTask', 'tasks', {"_id": sample["task_id"]}, None),
+        ('UpdateTaskStatus', 'tasks', {"_id": sample["task_id"], "status": {"$ne": "done"}}, None),
+        ('GetProjectTasks', 'tasks', {"project_id": sample["project_id"]}, by_id),
+        ('BatchProjectTasks', 'tasks', {"project_id": {"$in": [sample["project_id"]]}}, by_id),
+        ('GetProjects', 'projects', {}, by_id),
+        ('GetProjects?status', 'projects', {"status": "active"}, by_id),
+        ('ProjectStats', 'stats', {"kind": "project"}, by_id),
+        ('InternStats', 'stats', {"kind": "owner", "owner": sample["email"]}, by_id),
+        ('Search', 'search', {"terms": {"$all": ["ta"]}}, None),
+        ('Search?title_words', 'search', {"title_words": {"$all": ["task"]}}, None),
+        ('Search?title_terms', 'search', {"title_terms": {"$all": ["ta"]}}, None),
+        ('AuditLog', 'audit_log', {"object_id": sample["task_id"]}, by_id),
+    ]
+
+
+def plan_stages(plan):
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(plan_stages(value))
+    return stages
+
+
+def check(db, sample):
+    """Kanonik sorguları explain eder; COLLSCAN kullananları (kaynak, aşamalar) listesi olarak döner."""
+    problems = []
+    for resource, collection, query, sort in canonical_queries(sample):
+        command = {"find": collection, "filter": query, "limit": 101}
+        if sort:
+            command["sort"] = dict(sort)
+        plan = db.command('explain', command, verbosity='queryPlanner')
+        stages = plan_stages(plan.get("queryPlanner", {}).get("winningPlan"))
+        logger.info(f"{resource}: {' <- '.join(stages)}")
+        if 'COLLSCAN' in stages:
+            problems.append((resource, stages))
+    return problems
+
+
+def seed(db, users=50, projects=10, tasks_per_user=5):
+    """Planlayıcının gerçek seçim yapması için küçük bir örnek veri seti yazar."""
+    import search
+    import stats
+
+    emails = [f"intern{i}@indexcheck.local" for i in range(users)]
+    db.users.insert_many([{"email": email, "name": "Intern", "surname": str(i), "role": "intern"}
+                          for i, email in enumerate(emails)])
+    db.users.insert_one({"email": "admin@indexcheck.local", "name": "Admin", "surname": "0", "role": "admin"})
+    project_ids = [ObjectId() for _ in range(projects)]
+    db.projects.insert_many([{"_id": project_id, "project_name": f"Project {i}", "description": "Index check",
+                              "status": "active" if i % 2 else "done"} for i, project_id in enumerate(project_ids)])
+    db.tasks.insert_many([{"_id": str(ObjectId()), "header": f"Task {n}", "details": "Index check",
+                           "status": ["todo", "test", "done"][n % 3], "owner": email,
+                           "project_id": str(project_ids[(i + n) % projects])}
+                          for i, email in enumerate(emails) for n in range(tasks_per_user)])
+    stats.rebuild(db)
+    search.reindex(db)
+    task = db.tasks.find_one()
+    return {"email": emails[0], "task_id": task["_id"], "project_id": task["project_id"]}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Apply and verify MongoDB indexes")
+    parser.add_argument('command', choices=['apply', 'check'])
+    parser.add_argument('--mongo-uri', help="mongod for `check` (defaults to MONGO_URI)")
+    parser.add_argument('--db-name', default='intern_management_indexcheck')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == 'apply':
+        from app import db
+        sys.exit(1 if ensure(db) else 0)
+
+    from pymongo import MongoClient
+    import app
+
+    client = MongoClient(args.mongo_uri or app.MONGO_URI)
+    client.drop_database(args.db_name)
+    check_db = client[args.db_name]
+    try:
+        if ensure(check_db):
+            sys.exit(1)
+        problems = check(check_db, seed(check_db))
+    finally:
+        client.drop_database(args.db_name)
+
+    for resource, stages in problems:
+        logging.error(f"{resource} uses a collection scan: {' <- '.join(stages)}")
+    sys.exit(1 if problems else 0)
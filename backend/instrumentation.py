@@ -0,0 +1,343 @@
+"""İstek bazında ölçüm: süre, Mongo komut sayısı, dönen belge ve yanıt boyutu.
+
+`init_app(app)` Flask'a before/after_request kancalarını bağlar; `command_monitor`
+pymongo istemcisine `event_listeners` olarak verilir. Sonuçlar `Server-Timing`
+başlığına yazılır, eşiği aşan istekler ve komutlar loglanır (komutlar explain
+planıyla birlikte), toplu histogramlar `metrics.render()` ile Prometheus metin
+biçiminde dışa verilir.
+
+Histogramlar süreç başınadır; gunicorn birden çok worker çalıştırdığında METRICS_DIR
+ayarlanır, her worker kendi serilerini oraya `metrics_<pid>.json` olarak yazar ve
+/metrics'e hangi worker cevap verirse versin tüm dosyaların toplamını döner.
+"""
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import g, request
+from pymongo import monitoring
+
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 500))
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 100))
+EXPLAIN_SLOW_QUERIES = os.environ.get('EXPLAIN_SLOW_QUERIES', '1') == '1'
+# Aynı biçimdeki (değerleri gizlenmiş) sorgu bu süre içinde en fazla bir kez explain edilir
+EXPLAIN_INTERVAL_SECONDS = float(os.environ.get('EXPLAIN_INTERVAL_SECONDS', 300))
+METRICS_DIR = os.environ.get('METRICS_DIR') or None
+METRICS_FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', 5))
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Açıklanabilir komutlar ve explain'e gönderilmemesi gereken oturum alanları
+EXPLAINABLE_COMMANDS = {'find', 'aggregate', 'count', 'distinct', 'update', 'delete', 'findAndModify'}
+SESSION_FIELDS = {'lsid', '$clusterTime', '$db', '$readPreference', 'txnNumber', 'autocommit', 'startTransaction'}
+# Loglara yalnızca şekli yazılan alanlar (filtre değerleri e-posta, güncellemeler parola özeti içerebilir)
+REDACTED_FIELDS = {'filter', 'q', 'query', 'u', 'update', 'updates', 'deletes', 'documents', 'pipeline'}
+
+_state = threading.local()
+logger = logging.getLogger('instrumentation')
+
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.commands = 0
+        self.mongo_micros = 0
+        self.documents = 0
+        self._lock = threading.Lock()
+
+    def add_command(self, micros, documents):
+        with self._lock:
+            self.commands += 1
+            self.mongo_micros += micros
+            self.documents += documents
+
+
+def current_stats():
+    return getattr(_state, 'stats', None)
+
+
+def bind(fn):
+    """fn'i başka bir thread'de çalıştırırken komutların o anki isteğe sayılmasını sağlar."""
+    stats = current_stats()
+
+    def run(*args, **kwargs):
+        previous = current_stats()
+        _state.stats = stats
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _state.stats = previous
+
+    return run
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.label_names = label_names
+        self._series = defaultdict(lambda: [[0] * len(buckets), 0.0, 0])
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series[labels]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (bucket_counts, total, count) in sorted(self._series.items()):
+                base = ','.join(f'{name}="{value}"' for name, value in zip(self.label_names, labels))
+                prefix = base + ',' if base else ''
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {bucket_count}')
+                lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+                lines.append(f'{self.name}_sum{{{base}}} {total}')
+                lines.append(f'{self.name}_count{{{base}}} {count}')
+        return lines
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(labels), list(bucket_counts), total, count]
+                    for labels, (bucket_counts, total, count) in self._series.items()]
+
+    def merge(self, snapshot):
+        with self._lock:
+            for labels, bucket_counts, total, count in snapshot:
+                series = self._series[tuple(labels)]
+                series[0] = [a + b for a, b in zip(series[0], bucket_counts)]
+                series[1] += total
+                series[2] += count
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.request_duration = Histogram(
+            'http_request_duration_seconds', 'Request wall time.', DURATION_BUCKETS, ('endpoint', 'method', 'status'))
+        self.request_commands = Histogram(
+            'http_request_mongo_commands', 'Mongo commands issued per request.', COUNT_BUCKETS, ('endpoint', 'method'))
+        self.request_documents = Histogram(
+            'http_request_mongo_documents', 'Documents returned by Mongo per request.', COUNT_BUCKETS, ('endpoint', 'method'))
+        self.response_bytes = Histogram(
+            'http_response_bytes', 'Serialized response size.', BYTES_BUCKETS, ('endpoint', 'method'))
+        self.command_duration = Histogram(
+            'mongo_command_duration_seconds', 'Mongo command latency.', DURATION_BUCKETS, ('command',))
+
+    def histograms(self):
+        return (self.request_duration, self.request_commands, self.request_documents,
+                self.response_bytes, self.command_duration)
+
+    def render(self):
+        registry = self._aggregate() if METRICS_DIR else self
+        lines = []
+        for histogram in registry.histograms():
+            lines.extend(histogram.render())
+        return '\n'.join(lines) + '\n'
+
+    def flush(self):
+        """Bu sürecin serilerini METRICS_DIR'e atomik olarak yazar."""
+        if not METRICS_DIR:
+            return
+        path = os.path.join(METRICS_DIR, f'metrics_{os.getpid()}.json')
+        data = {histogram.name: histogram.snapshot() for histogram in self.histograms()}
+        with open(path + '.tmp', 'w') as f:
+            json.dump(data, f)
+        os.replace(path + '.tmp', path)
+
+    def start(self):
+        """Worker içinde periyodik yazımı başlatır; çıkmış worker'ların dosyaları sayaçlar düşmesin diye kalır."""
+        if not METRICS_DIR:
+            return
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        atexit.register(self.flush)
+
+        def run():
+            while True:
+                time.sleep(METRICS_FLUSH_SECONDS)
+                try:
+                    self.flush()
+                except OSError as e:
+                    logger.warning(f"Failed to write metrics: {e}")
+
+        threading.Thread(target=run, name="metrics-flush", daemon=True).start()
+
+    def _aggregate(self):
+        try:
+            self.flush()
+        except OSError as e:
+            logger.warning(f"Failed to write metrics: {e}")
+        total = MetricsRegistry()
+        by_name = {histogram.name: histogram for histogram in total.histograms()}
+        for path in glob.glob(os.path.join(METRICS_DIR, 'metrics_*.json')):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, snapshot in data.items():
+                if name in by_name:
+                    by_name[name].merge(snapshot)
+        return total
+
+
+metrics = MetricsRegistry()
+
+
+def reset_metrics_dir():
+    """Sunucu açılışında önceki çalıştırmadan kalan worker dosyalarını siler."""
+    if not METRICS_DIR:
+        return
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    for path in glob.glob(os.path.join(METRICS_DIR, 'metrics_*.json*')):
+        os.remove(path)
+
+
+class CommandMonitor(monitoring.CommandListener):
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._explainer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+        self._explain_busy = False  # Kuyrukta ya da çalışan bir explain varken yenisi eklenmez
+        self._explained = {}  # sorgu biçimi -> son explain zamanı
+        self.client = None
+
+    def started(self, event):
+        if getattr(_state, 'explaining', False):
+            return
+        if event.command_name in EXPLAINABLE_COMMANDS and EXPLAIN_SLOW_QUERIES:
+            with self._lock:
+                self._pending[event.request_id] = (event.database_name, event.command)
+
+    def succeeded(self, event):
+        if getattr(_state, 'explaining', False):
+            return
+        with self._lock:
+            pending = self._pending.pop(event.request_id, None)
+
+        metrics.command_duration.observe((event.command_name,), event.duration_micros / 1e6)
+        stats = current_stats()
+        if stats is not None:
+            stats.add_command(event.duration_micros, _returned_documents(event.reply))
+
+        duration_ms = event.duration_micros / 1000
+        if duration_ms >= SLOW_QUERY_MS:
+            command = pending and {key: value for key, value in pending[1].items() if key not in SESSION_FIELDS}
+            if command and self.client is not None and self._claim_explain(command):
+                self._explainer.submit(self._explain, pending[0], command, duration_ms)
+            else:
+                logger.warning(f"Slow Mongo command {event.command_name} took {duration_ms:.1f}ms")
+
+    def failed(self, event):
+        with self._lock:
+            self._pending.pop(event.request_id, None)
+        stats = current_stats()
+        if stats is not None:
+            stats.add_command(event.duration_micros, 0)
+
+    def _claim_explain(self, command):
+        """Explain boştaysa ve bu biçim son aralıkta explain edilmediyse sırayı alır."""
+        shape = repr(_redact_command(command))
+        now = time.monotonic()
+        with self._lock:
+            if self._explain_busy:
+                return False
+            last = self._explained.get(shape)
+            if last is not None and now - last < EXPLAIN_INTERVAL_SECONDS:
+                return False
+            if len(self._explained) > 10000:
+                self._explained = {key: at for key, at in self._explained.items()
+                                   if now - at < EXPLAIN_INTERVAL_SECONDS}
+            self._explained[shape] = now
+            self._explain_busy = True
+            return True
+
+    def _explain(self, database_name, command, duration_ms):
+        _state.explaining = True
+        try:
+            shape = _redact_command(command)
+            plan = self.client[database_name].command('explain', command, verbosity='queryPlanner')
+            winning = plan.get('queryPlanner', {}).get('winningPlan')
+            logger.warning(f"Slow Mongo command took {duration_ms:.1f}ms: {shape} plan={winning}")
+        except Exception as e:
+            logger.warning(f"Slow Mongo command took {duration_ms:.1f}ms: {_redact_command(command)} (explain failed: {e})")
+        finally:
+            _state.explaining = False
+            with self._lock:
+                self._explain_busy = False
+
+
+def _redact(value):
+    """Anahtarları ve operatörleri koruyup değerleri '?' ile değiştirir."""
+    if isinstance(value, dict):
+        return {key: _redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_redact(item) for item in value]
+    return '?'
+
+
+def _redact_command(command):
+    # `update` komutunda ilk anahtar koleksiyon adıdır; yalnızca belge/liste değerleri gizlenir
+    return {key: _redact(value) if key in REDACTED_FIELDS and isinstance(value, (dict, list)) else value
+            for key, value in command.items()}
+
+
+def _returned_documents(reply):
+    cursor = reply.get('cursor') if isinstance(reply, dict) else None
+    if cursor:
+        return len(cursor.get('firstBatch', cursor.get('nextBatch', [])))
+    return 0
+
+
+command_monitor = CommandMonitor()
+
+
+def init_app(app):
+    @app.before_request
+    def start_request_stats():
+        g.request_stats = _state.stats = RequestStats()
+
+    @app.after_request
+    def finish_request_stats(response):
+        stats = getattr(g, 'request_stats', None)
+        _state.stats = None
+        if stats is None:
+            return response
+
+        elapsed = time.perf_counter() - stats.started
+        endpoint = request.endpoint or 'unknown'
+        method = request.method
+        # Akış yanıtlarında (SSE, send_file) uzunluk hesaplamak gövdeyi tüketir
+        size = 0 if response.is_streamed or response.direct_passthrough else (response.calculate_content_length() or 0)
+
+        metrics.request_duration.observe((endpoint, method, str(response.status_code)), elapsed)
+        metrics.request_commands.observe((endpoint, method), stats.commands)
+        metrics.request_documents.observe((endpoint, method), stats.documents)
+        metrics.response_bytes.observe((endpoint, method), size)
+
+        response.headers['Server-Timing'] = (
+            f'app;dur={elapsed * 1000:.1f}, '
+            f'mongo;dur={stats.mongo_micros / 1000:.1f};desc="{stats.commands} commands, {stats.documents} docs"'
+        )
+
+        if elapsed * 1000 >= SLOW_REQUEST_MS:
+            logger.warning(
+                f"Slow request {method} {request.path} took {elapsed * 1000:.1f}ms "
+                f"({stats.commands} Mongo commands, {stats.documents} docs, {size} bytes)"
+            )
+        return response
+
+    return app
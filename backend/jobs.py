@@ -0,0 +1,231 @@
+"""Arka plan işleri: denetim kaydı (audit log) ve bildirimler.
+
+Yazma kaynakları değişiklik olaylarını `queue.enqueue_many(...)` ile `jobs`
+koleksiyonuna tek bir insert olarak bırakır; istek yolunda başka bir iş yapılmaz.
+İşçiler (uygulama içindeki thread'ler ya da `python jobs.py worker` süreci) işleri
+türlerine göre gruplar halinde alır:
+  - audit: `audit_log` koleksiyonuna toplu insert; kayıtlar yalnızca eklenir, değiştirilmez.
+    Kayıt _id'si iş _id'si olduğundan yeniden deneme çift kayıt üretmez.
+  - notify: NOTIFY_SENDER ile seçilen gönderici üzerinden bildirim.
+Başarısız iş JOBS_MAX_ATTEMPTS kez üstel beklemeyle yeniden denenir, sonra
+`dead` durumuna düşer (dead-letter). Kilidi süresi dolan `running` işler,
+işçisi ölmüş sayılıp yeniden alınır.
+
+    python jobs.py worker         # ayrı işçi süreci
+    python jobs.py retry-dead     # dead işleri yeniden kuyruğa al
+"""
+import argparse
+import importlib
+import json
+import logging
+import os
+import threading
+import time
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+JOBS_MAX_ATTEMPTS = int(os.environ.get('JOBS_MAX_ATTEMPTS', 5))
+JOBS_BATCH_SIZE = int(os.environ.get('JOBS_BATCH_SIZE', 100))
+JOBS_POLL_SECONDS = float(os.environ.get('JOBS_POLL_SECONDS', 1.0))
+JOBS_LEASE_SECONDS = int(os.environ.get('JOBS_LEASE_SECONDS', 60))
+NOTIFY_SENDER = os.environ.get('NOTIFY_SENDER', 'file')  # file, log veya "modül:Sınıf"
+NOTIFY_FILE = os.environ.get('NOTIFY_FILE', os.path.join(os.path.dirname(__file__), 'notifications.log'))
+
+logger = logging.getLogger('jobs')
+
+
+class FileSender:
+    """Bildirimleri JSON satırları olarak dosyaya yazar; geliştirme ve test için."""
+
+    def __init__(self, path=NOTIFY_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, recipient, subject, body):
+        line = json.dumps({"to": recipient, "subject": subject, "body": body, "sent_at": time.time()})
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+
+class LogSender:
+    def send(self, recipient, subject, body):
+        logger.info(f"Notification to {recipient}: {subject}")
+
+
+def load_sender(name=NOTIFY_SENDER):
+    if name == 'file':
+        return FileSender()
+    if name == 'log':
+        return LogSender()
+    # Gerçek gönderici (SMTP, Slack, ...) "paket.modül:Sınıf" biçiminde verilir
+    module_name, _, class_name = name.partition(':')
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def jobs_for_event(event, actor):
+    """Bir değişiklik olayından audit ve gerekiyorsa notify işleri üretir."""
+    now = time.time()
+    data = event.get("data") or {}
+    audit = {"type": event["type"], "object_id": event["id"], "actor": actor, "at": now}
+    for field in ("owner", "previous_owner", "project_id"):
+        if event.get(field) is not None:
+            audit[field] = event[field]
+    if data:
+        audit["data"] = data
+    payloads = [('audit', audit)]
+
+    # Görevin sahibi, değişikliği kendisi yapmadıysa bilgilendirilir
+    owner = event.get("owner")
+    if event["type"].startswith('task.') and owner and owner != actor:
+        header = data.get("header") or event["id"]
+        if event["type"] == 'task.created' or event.get("previous_owner") not in (None, owner):
+            subject = f"New task assigned to you: {header}"
+        elif event["type"] == 'task.deleted':
+            subject = f"Your task was deleted: {event['id']}"
+        else:
+            subject = f"Your task was updated: {header} ({data.get('status')})"
+        payloads.append(('notify', {"to": owner, "subject": subject, "body": f"{subject}\nBy: {actor}"}))
+
+    return [{"_id": ObjectId(), "type": kind, "payload": payload, "state": "queued", "attempts": 0,
+             "run_at": now, "created_at": now} for kind, payload in payloads]
+
+
+class JobQueue:
+    def __init__(self, get_db):
+        self._get_db = get_db
+        self._stopped = threading.Event()
+        self._threads = []
+        self.sender = None
+
+    def enqueue_many(self, jobs):
+        if not jobs:
+            return
+        try:
+            self._get_db().jobs.insert_many(jobs, ordered=False)
+        except Exception as e:
+            # Kuyruğa yazılamayan iş isteği başarısız kılmaz; olay yine de loglanır
+            logger.error(f"Failed to enqueue {len(jobs)} jobs: {e}")
+
+    def claim(self, kind, worker_id):
+        """Çalıştırılmaya hazır en fazla JOBS_BATCH_SIZE işi bu işçiye kilitler."""
+        db = self._get_db()
+        now = time.time()
+        ready = {"type": kind, "$or": [
+            {"state": "queued", "run_at": {"$lte": now}},
+            {"state": "running", "locked_until": {"$lt": now}},
+        ]}
+        ids = [job["_id"] for job in db.jobs.find(ready, {"_id": 1}).sort("run_at", 1).limit(JOBS_BATCH_SIZE)]
+        if not ids:
+            return []
+        # Aynı işleri başka işçi de seçmiş olabilir; filtre tekrarlandığı için yalnızca biri kilitler
+        db.jobs.update_many(
+            {"$and": [{"_id": {"$in": ids}}, ready]},
+            {"$set": {"state": "running", "worker": worker_id, "locked_until": now + JOBS_LEASE_SECONDS},
+             "$inc": {"attempts": 1}}
+        )
+        return list(db.jobs.find({"_id": {"$in": ids}, "state": "running", "worker": worker_id}))
+
+    def complete(self, jobs):
+        self._get_db().jobs.delete_many({"_id": {"$in": [job["_id"] for job in jobs]}})
+
+    def fail(self, job, error):
+        db = self._get_db()
+        if job["attempts"] >= JOBS_MAX_ATTEMPTS:
+            logger.error(f"Job {job['_id']} ({job['type']}) moved to dead letter after {job['attempts']} attempts: {error}")
+            db.jobs.update_one({"_id": job["_id"]}, {"$set": {"state": "dead", "last_error": str(error)},
+                                                     "$unset": {"worker": "", "locked_until": ""}})
+        else:
+            db.jobs.update_one({"_id": job["_id"]}, {"$set": {
+                "state": "queued", "run_at": time.time() + 2 ** job["attempts"], "last_error": str(error)
+            }, "$unset": {"worker": "", "locked_until": ""}})
+
+    def run_audit(self, jobs):
+        entries = [dict(job["payload"], _id=job["_id"]) for job in jobs]
+        try:
+            self._get_db().audit_log.insert_many(entries, ordered=False)
+        except BulkWriteError as e:
+            # Yeniden denemede daha önce yazılmış kayıtlar çift anahtar hatası verir; onlar başarılı sayılır
+            failed = [error for error in e.details.get("writeErrors", []) if error.get("code") != 11000]
+            if failed:
+                raise
+        self.complete(jobs)
+
+    def run_notify(self, jobs):
+        done = []
+        for job in jobs:
+            payload = job["payload"]
+            try:
+                self.sender.send(payload["to"], payload["subject"], payload["body"])
+                done.append(job)
+            except Exception as e:
+                self.fail(job, e)
+        if done:
+            self.complete(done)
+
+    def work_once(self, worker_id):
+        """Her türden bir grup işi işler; iş bulunduysa True döner."""
+        found = False
+        for kind, handler in (('audit', self.run_audit), ('notify', self.run_notify)):
+            jobs = self.claim(kind, worker_id)
+            if not jobs:
+                continue
+            found = True
+            try:
+                handler(jobs)
+            except Exception as e:
+                for job in jobs:
+                    self.fail(job, e)
+        return found
+
+    def _loop(self, worker_id, stopped):
+        while not stopped.is_set():
+            try:
+                if self.work_once(worker_id):
+                    continue
+            except Exception as e:
+                logger.error(f"Job worker {worker_id} error: {e}")
+            stopped.wait(JOBS_POLL_SECONDS)
+
+    def start(self, threads):
+        self.stop()
+        self._stopped = threading.Event()
+        if self.sender is None:
+            self.sender = load_sender()
+        for n in range(threads):
+            worker_id = f"{os.getpid()}-{n}-{ObjectId()}"
+            thread = threading.Thread(target=self._loop, args=(worker_id, self._stopped),
+                                      name=f"jobs-worker-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stopped.set()
+        self._threads = []
+
+    def retry_dead(self):
+        result = self._get_db().jobs.update_many(
+            {"state": "dead"}, {"$set": {"state": "queued", "attempts": 0, "run_at": time.time()}}
+        )
+        return result.modified_count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Background job worker")
+    parser.add_argument('command', choices=['worker', 'retry-dead'])
+    parser.add_argument('--threads', type=int, default=2)
+    args = parser.parse_args()
+
+    import app
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == 'retry-dead':
+        logging.info(f"Requeued {app.job_queue.retry_dead()} dead jobs")
+    else:
+        app.job_queue.start(args.threads)
+        logging.info(f"Job worker started with {args.threads} threads")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            app.job_queue.stop()
@@ -0,0 +1,83 @@
+"""Kullanıcı belgelerine gömülü görevleri (users.tasks[]) `tasks` koleksiyonuna taşır.
+
+Kullanım:
+    python migrate_tasks.py                 # tüm kullanıcıları taşı
+    python migrate_tasks.py --batch-size 50 # her seferde 50 kullanıcı işle
+    python migrate_tasks.py --keep-embedded # gömülü dizileri silmeden kopyala
+    python migrate_tasks.py --dry-run       # sadece kaç görev taşınacağını göster
+
+Betik yarıda kesilirse tekrar çalıştırmak yeterlidir: görevler `_id` üzerinden
+yalnızca yoksa eklenir ($setOnInsert), böylece iki kez yazılmaz ve `tasks`
+koleksiyonunda sonradan düzenlenmiş görevler gömülü eski kopyayla ezilmez; bir
+kullanıcının dizisi ise ancak tüm görevleri kopyalandıktan sonra boşaltılır.
+"""
+import argparse
+import logging
+
+from pymongo import UpdateOne
+
+import search
+import stats
+from app import db, ensure_indexes, revisions
+
+
+def migrate(batch_size=100, keep_embedded=False, dry_run=False):
+    ensure_indexes()
+
+    query = {"tasks.0": {"$exists": True}}
+    last_id = None
+    migrated_users = 0
+    migrated_tasks = 0
+
+    while True:
+        batch_query = dict(query)
+        if last_id is not None:
+            batch_query["_id"] = {"$gt": last_id}
+        users = list(db.users.find(batch_query, {"email": 1, "tasks": 1}).sort("_id", 1).limit(batch_size))
+        if not users:
+            break
+
+        for user in users:
+            last_id = user["_id"]
+            operations = []
+            for task in user.get("tasks", []):
+                task = dict(task)
+                task_id = str(task.pop("_id"))
+                task.setdefault("owner", user.get("email"))
+                operations.append(UpdateOne({"_id": task_id}, {"$setOnInsert": task}, upsert=True))
+
+            if dry_run:
+                migrated_tasks += len(operations)
+                migrated_users += 1
+                continue
+
+            if operations:
+                db.tasks.bulk_write(operations, ordered=False)
+            if not keep_embedded:
+                db.users.update_one({"_id": user["_id"]}, {"$unset": {"tasks": ""}})
+
+            migrated_tasks += len(operations)
+            migrated_users += 1
+
+        logging.info(f"Migrated {migrated_tasks} tasks from {migrated_users} users so far")
+
+    if migrated_tasks and not dry_run:
+        # Upsert'ler sayaçları ve arama indeksini güncellemediği için ikisi de baştan kurulur
+        stats.rebuild(db)
+        search.reindex(db, ['task'])
+        # Önbelleklenmiş görev, istatistik ve kullanıcı yanıtları (ETag'ler) geçersiz kılınır
+        revisions.bump('tasks', 'users')
+
+    return migrated_users, migrated_tasks
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Move embedded user tasks into the tasks collection")
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--keep-embedded', action='store_true')
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    users, tasks = migrate(args.batch_size, args.keep_embedded, args.dry_run)
+    logging.info(f"Done: {tasks} tasks from {users} users")
@@ -0,0 +1,160 @@
+"""Şifre hash'leme ve giriş denemesi sınırlama; Flask ve ASGI sürümleri ortak kullanır."""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import bcrypt
+from pymongo.errors import DuplicateKeyError
+
+# bcrypt ayarları: maliyet değiştiğinde eski hash'ler girişte yeniden hesaplanır
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+BCRYPT_WORKERS = int(os.environ.get('BCRYPT_WORKERS', os.cpu_count() or 2))
+BCRYPT_MAX_PENDING = int(os.environ.get('BCRYPT_MAX_PENDING', 32))
+
+# Giriş denemesi sınırları (pencere saniye cinsinden). E-posta başına tüm denemeler,
+# IP başına yalnızca başarısız denemeler sayılır: aynı NAT arkasındaki stajyerlerin
+# sabah girişleri limite takılmaz
+LOGIN_ATTEMPT_WINDOW = int(os.environ.get('LOGIN_ATTEMPT_WINDOW', 300))
+LOGIN_ATTEMPTS_PER_EMAIL = int(os.environ.get('LOGIN_ATTEMPTS_PER_EMAIL', 10))
+LOGIN_ATTEMPTS_PER_IP = int(os.environ.get('LOGIN_ATTEMPTS_PER_IP', 50))
+
+
+class HasherBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    """bcrypt işlemlerini sınırlı bir thread havuzunda çalıştırır.
+
+    bcrypt hesaplama sırasında GIL'i bıraktığı için thread'ler çekirdeklere yayılır;
+    havuz ve bekleme kuyruğu dolduğunda HasherBusy fırlatılır ve istek 503 ile reddedilir.
+    """
+
+    def __init__(self, rounds, workers, max_pending):
+        self.rounds = rounds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        # Toplu işler (içe aktarma) havuzun en fazla yarısını kullanır, girişler için yer kalır
+        self._bulk_slots = threading.BoundedSemaphore(max(1, workers // 2))
+
+    def submit(self, fn, *args):
+        """İşi havuza verir ve future döner; kuyruk doluysa HasherBusy fırlatır."""
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _run(self, fn, *args):
+        return self.submit(fn, *args).result()
+
+    def hash(self, password):
+        return self._run(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(self.rounds))
+
+    def hash_many(self, passwords):
+        """Şifreleri paralel hash'ler; kuyruk doluysa reddetmek yerine bekler."""
+        futures = []
+        for password in passwords:
+            self._bulk_slots.acquire()
+            self._slots.acquire()
+            future = self._executor.submit(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(self.rounds))
+            future.add_done_callback(lambda _: (self._slots.release(), self._bulk_slots.release()))
+            futures.append(future)
+        return [future.result() for future in futures]
+
+    def verify(self, password, hashed):
+        return self._run(bcrypt.checkpw, password.encode('utf-8'), hashed)
+
+    async def hash_async(self, password):
+        # Olay döngüsü bloklanmaz; hesaplama aynı thread havuzunda yapılır
+        return await asyncio.wrap_future(
+            self.submit(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(self.rounds)))
+
+    async def verify_async(self, password, hashed):
+        return await asyncio.wrap_future(self.submit(bcrypt.checkpw, password.encode('utf-8'), hashed))
+
+    def needs_rehash(self, hashed):
+        # $2b$12$... biçiminde maliyet üçüncü alanda
+        try:
+            return int(hashed.split(b'$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+
+password_hasher = PasswordHasher(BCRYPT_ROUNDS, BCRYPT_WORKERS, BCRYPT_MAX_PENDING)
+
+
+class AttemptThrottle:
+    """Anahtar başına pencere içinde en fazla `limit` deneme kabul eder.
+
+    Sayaçlar `login_attempts` koleksiyonunda tutulur, böylece limit tüm worker'lar
+    ve süreçler için ortaktır ve yeniden başlatmada sıfırlanmaz. Pencere sabittir
+    (`window` saniyelik dilimler); her dilim `_id = kapsam:anahtar:dilim` olan bir
+    belgedir, `$inc` ile atomik artırılır ve TTL indeksi (expires_at) ile silinir.
+    Metotlar pymongo koleksiyonu alır; *_async sürümleri Motor koleksiyonu alır.
+    """
+
+    def __init__(self, scope, limit, window):
+        self.scope = scope
+        self.limit = limit
+        self.window = window
+
+    def _bucket(self, key):
+        bucket = int(time.time() // self.window)
+        expires_at = datetime.fromtimestamp((bucket + 2) * self.window, timezone.utc)
+        return f"{self.scope}:{key}:{bucket}", {"$inc": {"count": 1}, "$setOnInsert": {"expires_at": expires_at}}
+
+    def _under_limit(self, bucket_id):
+        return {"_id": bucket_id, "count": {"$lt": self.limit}}
+
+    def hit(self, collection, key):
+        """Denemeyi kaydeder; limit dolmuşsa kaydetmeden False döner."""
+        bucket_id, update = self._bucket(key)
+        try:
+            # Limit doluysa filtre eşleşmez, upsert aynı _id'yi eklemeye çalışıp reddedilir
+            collection.update_one(self._under_limit(bucket_id), update, upsert=True)
+        except DuplicateKeyError:
+            return False
+        return True
+
+    def blocked(self, collection, key):
+        """Deneme kaydetmeden limitin dolup dolmadığını söyler; sayım record() ile yapılır."""
+        attempts = collection.find_one({"_id": self._bucket(key)[0]})
+        return bool(attempts) and attempts["count"] >= self.limit
+
+    def record(self, collection, key):
+        bucket_id, update = self._bucket(key)
+        collection.update_one({"_id": bucket_id}, update, upsert=True)
+
+    def reset(self, collection, key):
+        collection.delete_one({"_id": self._bucket(key)[0]})
+
+    async def hit_async(self, collection, key):
+        bucket_id, update = self._bucket(key)
+        try:
+            await collection.update_one(self._under_limit(bucket_id), update, upsert=True)
+        except DuplicateKeyError:
+            return False
+        return True
+
+    async def blocked_async(self, collection, key):
+        attempts = await collection.find_one({"_id": self._bucket(key)[0]})
+        return bool(attempts) and attempts["count"] >= self.limit
+
+    async def record_async(self, collection, key):
+        bucket_id, update = self._bucket(key)
+        await collection.update_one({"_id": bucket_id}, update, upsert=True)
+
+    async def reset_async(self, collection, key):
+        await collection.delete_one({"_id": self._bucket(key)[0]})
+
+
+email_throttle = AttemptThrottle('email', LOGIN_ATTEMPTS_PER_EMAIL, LOGIN_ATTEMPT_WINDOW)
+ip_throttle = AttemptThrottle('ip', LOGIN_ATTEMPTS_PER_IP, LOGIN_ATTEMPT_WINDOW)
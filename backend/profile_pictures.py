@@ -0,0 +1,89 @@
+"""Profil fotoğraflarının diskte saklanması ve sunulacak dosyanın bulunması.
+
+Fotoğraflar belge içinde değil `uploads/profile_pictures/<kullanıcı id>.<uzantı>`
+olarak tutulur, belgeye yalnızca göreli yol yazılır. Flask (app.py) ve ASGI
+(asgi.py) sürümleri aynı klasörü kullanır.
+"""
+import logging
+import os
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow yoksa küçük resim üretilmez, orijinal dosya sunulur
+    Image = None
+
+UPLOAD_FOLDER = 'uploads'
+PROFILE_PICTURE_FOLDER = os.path.join(UPLOAD_FOLDER, 'profile_pictures')
+PROFILE_PICTURE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+# Pillow'un bildirdiği biçim -> kaydedilen uzantı; Content-Type dosya adından çıkarılır
+FORMAT_EXTENSIONS = {'PNG': 'png', 'JPEG': 'jpg', 'GIF': 'gif', 'WEBP': 'webp'}
+PROFILE_PICTURE_THUMBNAIL_SIZE = (128, 128)
+PROFILE_PICTURE_MAX_AGE = 7 * 24 * 3600  # URL sürüm içerdiği için uzun süre önbelleklenebilir
+if not os.path.exists(PROFILE_PICTURE_FOLDER):
+    os.makedirs(PROFILE_PICTURE_FOLDER)
+
+
+def picture_extension(filename):
+    """Yüklenen dosyanın uzantısı; desteklenmiyorsa None."""
+    extension = filename.rsplit('.', 1)[-1].lower() if filename and '.' in filename else ''
+    return extension if extension in PROFILE_PICTURE_EXTENSIONS else None
+
+
+def save_profile_picture(user_id, stream, extension):
+    """Fotoğrafı diske yazar, mümkünse küçük resmini üretir ve göreli yolunu döner.
+
+    Pillow varsa uzantı dosyanın gerçek biçiminden belirlenir (verilen uzantı yalnızca
+    Pillow yokken kullanılır); Pillow'un açamadığı dosyalar ValueError ile reddedilir.
+    """
+    tmp_path = os.path.join(PROFILE_PICTURE_FOLDER, f"{user_id}.tmp")
+    if hasattr(stream, 'save'):
+        stream.save(tmp_path)
+    else:
+        with open(tmp_path, 'wb') as f:
+            f.write(stream)
+
+    if Image is not None:
+        try:
+            with Image.open(tmp_path) as image:
+                detected = FORMAT_EXTENSIONS.get(image.format)
+                image.verify()
+        except Exception:
+            detected = None
+        if detected is None:
+            os.remove(tmp_path)
+            raise ValueError("Unsupported profile picture type")
+        extension = detected
+
+    filename = f"{user_id}.{extension}"
+    path = os.path.join(PROFILE_PICTURE_FOLDER, filename)
+
+    # Önceki (farklı uzantılı) fotoğrafları temizle
+    for old_extension in PROFILE_PICTURE_EXTENSIONS:
+        old_path = os.path.join(PROFILE_PICTURE_FOLDER, f"{user_id}.{old_extension}")
+        if old_extension != extension and os.path.exists(old_path):
+            os.remove(old_path)
+    os.replace(tmp_path, path)
+
+    # Eski küçük resim yeni fotoğrafın yanında sunulmasın; üretilemezse orijinal sunulur
+    thumbnail_path = os.path.join(PROFILE_PICTURE_FOLDER, f"{user_id}_thumb.png")
+    if os.path.exists(thumbnail_path):
+        os.remove(thumbnail_path)
+    if Image is not None:
+        try:
+            with Image.open(path) as image:
+                image.thumbnail(PROFILE_PICTURE_THUMBNAIL_SIZE)
+                image.save(thumbnail_path, "PNG")
+        except Exception as e:
+            logging.warning(f"Thumbnail generation failed for {user_id}: {e}")
+
+    return os.path.join('profile_pictures', filename)
+
+
+def picture_path(user_id, stored_path, size=None):
+    """Sunulacak dosyanın mutlak yolu; dosya yoksa None. size='thumb' varsa küçük resmi tercih eder."""
+    path = os.path.abspath(os.path.join(UPLOAD_FOLDER, stored_path))
+    if size == 'thumb':
+        thumbnail_path = os.path.abspath(os.path.join(PROFILE_PICTURE_FOLDER, f"{user_id}_thumb.png"))
+        if os.path.exists(thumbnail_path):
+            path = thumbnail_path
+    return path if os.path.exists(path) else None
@@ -0,0 +1,242 @@
+"""Görev, proje ve kullanıcılar üzerinde önek destekli arama.
+
+Mongo'nun $text indeksi önek eşleşmesi yapmadığı için her kayıt `search`
+koleksiyonunda bir belgeyle temsil edilir:
+    {"_id": "task:<id>", "type": "task", "id": ..., "title": ..., "subtitle": ...,
+     "owner": ..., "terms": ["ta", "tas", "task", ...]}
+`terms` metindeki her kelimenin MIN_TERM_LENGTH..MAX_TERM_LENGTH uzunluğundaki
+önekleridir ve çoklu anahtar indeksiyle aranır; böylece "gör" yazıldığında
+"görev" de eşleşir ve tüm worker'lar aynı indeksi görür. `title_words` ve
+`title_terms` yalnızca başlığın kelimeleri ve önekleridir: aday sınırı
+(SEARCH_CANDIDATES) dolmadan önce başlıkta tam eşleşenler, sonra başlıkta önek
+eşleşenler alınır, böylece kısa öneklerde en iyi sonuçlar indeks sırasına kurban gitmez. Yazma kaynakları
+`index(db, kind, belgeler)` / `remove(db, kind, id'ler)` çağırır; indeks baştan
+kurulmak istenirse:
+
+    python search.py reindex
+"""
+import argparse
+import logging
+import os
+import re
+import unicodedata
+
+from pymongo import ReplaceOne
+
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = int(os.environ.get('SEARCH_MAX_TERM_LENGTH', 12))
+MAX_WORDS_PER_DOCUMENT = int(os.environ.get('SEARCH_MAX_WORDS', 100))
+SEARCH_CANDIDATES = int(os.environ.get('SEARCH_CANDIDATES', 200))  # Sıralamaya giren en fazla belge
+MAX_QUERY_TERMS = 8
+SUBTITLE_LENGTH = 140
+REINDEX_BATCH_SIZE = 1000
+
+# Tür -> (kaynak koleksiyon, kimlik alanı, başlık alanları, alt başlık alanları, ek alanlar)
+# Kullanıcılar e-postayla anılır; profil güncellemesi yalnızca e-postayı bilir
+# Adaylar bu sırayla toplanır: başlıkta tam kelime, başlıkta önek, herhangi bir yerde önek
+CANDIDATE_TIERS = ('title_words', 'title_terms', 'terms')
+INDEX_FIELDS = ("terms", "title_terms", "title_words")  # Yalnızca aramada kullanılır, yanıta girmez
+
+SOURCES = {
+    'task': ('tasks', '_id', ['header'], ['details'], ['owner']),
+    'project': ('projects', '_id', ['project_name'], ['description'], []),
+    'user': ('users', 'email', ['name', 'surname'], ['email', 'school'], ['role']),
+}
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+logger = logging.getLogger('search')
+
+
+def normalize(text):
+    # Türkçe karakterler ASCII karşılıklarıyla eşleşsin: "Görev" -> "gorev", "ışık" -> "isik"
+    text = unicodedata.normalize('NFKD', str(text).replace('ı', 'i').replace('İ', 'I'))
+    return ''.join(char for char in text if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text):
+    return _WORD.findall(normalize(text)) if text else []
+
+
+def terms_for(words):
+    terms = set()
+    for word in words:
+        for length in range(MIN_TERM_LENGTH, min(len(word), MAX_TERM_LENGTH) + 1):
+            terms.add(word[:length])
+    return sorted(terms)
+
+
+def _join(document, fields):
+    return ' '.join(str(document[field]) for field in fields if document.get(field))
+
+
+def entry_id(kind, document):
+    return f"{kind}:{document[SOURCES[kind][1]]}"
+
+
+def build_entry(kind, document):
+    _, key_field, title_fields, subtitle_fields, extra_fields = SOURCES[kind]
+    title = _join(document, title_fields)
+    subtitle = _join(document, subtitle_fields)
+
+    title_words = []
+    for word in tokenize(title):
+        if word not in title_words:
+            title_words.append(word)
+    words = list(title_words)
+    for word in tokenize(subtitle):
+        if word not in words:
+            words.append(word)
+    title_words = title_words[:MAX_WORDS_PER_DOCUMENT]
+    entry = {
+        "_id": entry_id(kind, document),
+        "type": kind,
+        "id": str(document[key_field]),
+        "title": title,
+        "subtitle": subtitle[:SUBTITLE_LENGTH],
+        "terms": terms_for(words[:MAX_WORDS_PER_DOCUMENT]),
+        "title_words": sorted({word[:MAX_TERM_LENGTH] for word in title_words}),
+        "title_terms": terms_for(title_words),
+    }
+    for field in extra_fields:
+        entry[field] = document.get(field)
+    return entry
+
+
+def index_operations(kind, documents):
+    return [ReplaceOne({"_id": entry_id(kind, document)}, build_entry(kind, document), upsert=True)
+            for document in documents]
+
+
+def index(db, kind, documents):
+    """Belgeleri arama indeksine ekler ya da günceller; hata isteği başarısız kılmaz."""
+    operations = index_operations(kind, documents)
+    if not operations:
+        return
+    try:
+        db.search.bulk_write(operations, ordered=False)
+    except Exception as e:
+        logger.error(f"Failed to update search index: {e}")
+
+
+def remove(db, kind, ids):
+    """ids: görev ve projeler için _id, kullanıcılar için e-posta."""
+    if not ids:
+        return
+    try:
+        db.search.delete_many({"_id": {"$in": [f"{kind}:{object_id}" for object_id in ids]}})
+    except Exception as e:
+        logger.error(f"Failed to update search index: {e}")
+
+
+def score(entry, query_terms):
+    """Başlıkta tam kelime > başlıkta önek > alt başlıkta kelime/önek > metnin devamında eşleşme."""
+    title_words = tokenize(entry.get("title"))
+    subtitle_words = tokenize(entry.get("subtitle"))
+    total = 0.0
+    for term in query_terms:
+        if term in title_words:
+            total += 4
+        elif any(word.startswith(term) for word in title_words):
+            total += 3
+        elif term in subtitle_words:
+            total += 2
+        elif any(word.startswith(term) for word in subtitle_words):
+            total += 1.5
+        else:
+            total += 1
+    return total
+
+
+def build_query(text, kinds=None, owner=None):
+    """Arama metninden (sorgu terimleri, Mongo filtresi) üretir; terim yoksa filtre None'dır.
+
+    owner verilirse görevlerden yalnızca o kişiye ait olanlar eşleşir.
+    """
+    query_terms = []
+    for word in tokenize(text):
+        term = word[:MAX_TERM_LENGTH]
+        if len(term) >= MIN_TERM_LENGTH and term not in query_terms:
+            query_terms.append(term)
+    query_terms = query_terms[:MAX_QUERY_TERMS]
+    if not query_terms:
+        return query_terms, None
+
+    query = {"terms": {"$all": query_terms}}
+    if kinds:
+        query["type"] = {"$in": list(kinds)}
+    if owner is not None:
+        query["$or"] = [{"type": {"$ne": "task"}}, {"owner": owner}]
+    return query_terms, query
+
+
+def tier_query(query, field, seen):
+    """build_query filtresinin `terms` koşulunu verilen alana taşır; önceki katmanlarda bulunanları dışlar."""
+    tier = {key: value for key, value in query.items() if key != 'terms'}
+    tier[field] = query["terms"]
+    if seen:
+        tier["_id"] = {"$nin": list(seen)}
+    return tier
+
+
+def rank(candidates, query_terms, limit):
+    for entry in candidates:
+        entry["score"] = score(entry, query_terms)
+    candidates.sort(key=lambda entry: (-entry["score"], len(entry["title"])))
+    return candidates[:limit]
+
+
+def search(db, text, kinds=None, owner=None, limit=20):
+    """Sorgudaki tüm kelimelerle önek olarak eşleşen kayıtları puana göre sıralı döner."""
+    query_terms, query = build_query(text, kinds, owner)
+    if query is None:
+        return []
+    candidates = {}
+    for field in CANDIDATE_TIERS:
+        if len(candidates) >= limit:
+            break
+        projection = {name: 0 for name in INDEX_FIELDS}
+        for entry in db.search.find(tier_query(query, field, candidates), projection).limit(SEARCH_CANDIDATES):
+            candidates[entry.pop("_id")] = entry
+    return rank(list(candidates.values()), query_terms, limit)
+
+
+def source_projection(kind):
+    """Kaynak koleksiyondan build_entry için gereken alanlar."""
+    _, key_field, title_fields, subtitle_fields, extra_fields = SOURCES[kind]
+    return {field: 1 for field in [key_field] + title_fields + subtitle_fields + extra_fields}
+
+
+def reindex(db, kinds=None):
+    """Arama indeksini kaynak koleksiyonlardan baştan kurar; indekslenen belge sayısını döner."""
+    total = 0
+    for kind in kinds or SOURCES:
+        collection = SOURCES[kind][0]
+        projection = source_projection(kind)
+        seen = []
+        batch = []
+        for document in db[collection].find({}, projection, batch_size=REINDEX_BATCH_SIZE):
+            seen.append(entry_id(kind, document))
+            batch.append(ReplaceOne({"_id": seen[-1]}, build_entry(kind, document), upsert=True))
+            if len(batch) >= REINDEX_BATCH_SIZE:
+                db.search.bulk_write(batch, ordered=False)
+                batch = []
+        if batch:
+            db.search.bulk_write(batch, ordered=False)
+        # Kaynağı silinmiş kayıtlar indeksten çıkarılır
+        db.search.delete_many({"type": kind, "_id": {"$nin": seen}})
+        total += len(seen)
+    return total
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Maintain the search index")
+    parser.add_argument('command', choices=['reindex'])
+    parser.add_argument('--type', choices=list(SOURCES), action='append',
+                        help="Only reindex this type (may be repeated)")
+    args = parser.parse_args()
+
+    from app import db, ensure_indexes
+
+    logging.basicConfig(level=logging.INFO)
+    ensure_indexes()
+    logging.info(f"Indexed {reindex(db, args.type)} documents")
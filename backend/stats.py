@@ -0,0 +1,112 @@
+"""Proje ve görev sahibi bazında görev durum sayaçları.
+
+`stats` koleksiyonunda her proje için
+    {"_id": "project:<id>", "kind": "project", "project_id": ..., "counts": {durum: adet}, "total": n}
+ve her görev sahibi için
+    {"_id": "owner:<email>", "kind": "owner", "owner": ..., "counts": {...}, "total": n}
+belgesi tutulur. Görev yazan her kaynak `record(db, [(önceki, sonraki), ...])` çağırır;
+sayaçlar $inc ile güncellendiği için eşzamanlı yazmalar birbirini ezmez. Sayaçlar
+bir hata yüzünden kayarsa `tasks` koleksiyonundan baştan hesaplanabilir:
+
+    python stats.py rebuild
+"""
+import argparse
+import logging
+from collections import defaultdict
+
+from pymongo import ReplaceOne, UpdateOne
+
+# Sayaç türü -> görev belgesindeki alan
+KINDS = {'project': 'project_id', 'owner': 'owner'}
+REBUILD_BATCH_SIZE = 1000
+
+logger = logging.getLogger('stats')
+
+
+def status_key(status):
+    # Durum adı alan yolu olarak kullanılır; '.' ve '$' Mongo'da özel anlamlı
+    if status is None or status == '':
+        return 'none'
+    return str(status).replace('.', '_').replace('$', '_')
+
+
+def deltas(before, after):
+    """Bir görev yazımının sayaçlara etkisi: {(tür, anahtar, durum): artış}."""
+    changes = defaultdict(int)
+    for task, sign in ((before, -1), (after, 1)):
+        if not task:
+            continue
+        for kind, field in KINDS.items():
+            key = task.get(field)
+            if key is None or key == '':
+                continue
+            changes[(kind, str(key), status_key(task.get("status")))] += sign
+    return {change: amount for change, amount in changes.items() if amount}
+
+
+def operations(changes):
+    """(önceki, sonraki) görev çiftlerinden stats koleksiyonuna yazılacak UpdateOne listesini üretir."""
+    increments = defaultdict(lambda: defaultdict(int))
+    for before, after in changes:
+        for (kind, key, status), amount in deltas(before, after).items():
+            increments[(kind, key)][f"counts.{status}"] += amount
+            increments[(kind, key)]["total"] += amount
+
+    operations = []
+    for (kind, key), inc in increments.items():
+        inc = {field: amount for field, amount in inc.items() if amount}
+        if inc:
+            operations.append(UpdateOne(
+                {"_id": f"{kind}:{key}"},
+                {"$inc": inc, "$setOnInsert": {"kind": kind, KINDS[kind]: key}},
+                upsert=True
+            ))
+    return operations
+
+
+def record(db, changes):
+    """(önceki, sonraki) görev çiftlerini sayaçlara uygular; oluşturmada önceki, silmede sonraki None'dır."""
+    pending = operations(changes)
+    if not pending:
+        return
+    try:
+        db.stats.bulk_write(pending, ordered=False)
+    except Exception as e:
+        # Görev yazıldı; sayaçlar bir sonraki rebuild ile düzelir
+        logger.error(f"Failed to update task stats: {e}")
+
+
+def rebuild(db):
+    """Sayaçları tasks koleksiyonundan baştan hesaplar; yazılan belge sayısını döner."""
+    documents = {}
+    for kind, field in KINDS.items():
+        pipeline = [{"$group": {"_id": {"key": f"${field}", "status": "$status"}, "count": {"$sum": 1}}}]
+        for row in db.tasks.aggregate(pipeline, allowDiskUse=True):
+            key = row["_id"].get("key")
+            if key is None or key == '':
+                continue
+            doc_id = f"{kind}:{key}"
+            document = documents.setdefault(doc_id, {"_id": doc_id, "kind": kind, field: str(key), "counts": {}, "total": 0})
+            status = status_key(row["_id"].get("status"))
+            document["counts"][status] = document["counts"].get(status, 0) + row["count"]
+            document["total"] += row["count"]
+
+    operations = [ReplaceOne({"_id": doc_id}, document, upsert=True) for doc_id, document in documents.items()]
+    for start in range(0, len(operations), REBUILD_BATCH_SIZE):
+        db.stats.bulk_write(operations[start:start + REBUILD_BATCH_SIZE], ordered=False)
+    # Artık görevi kalmayan proje ve sahiplerin sayaçları silinir
+    db.stats.delete_many({"_id": {"$nin": list(documents)}})
+    return len(documents)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Maintain precomputed task statistics")
+    parser.add_argument('command', choices=['rebuild'])
+    args = parser.parse_args()
+
+    from app import db, revisions
+
+    logging.basicConfig(level=logging.INFO)
+    logging.info(f"Rebuilt {rebuild(db)} stats documents")
+    # /stats/* yanıtları tasks revizyonuna göre önbelleklendiği için eski ETag'ler geçersiz kılınır
+    revisions.bump('tasks')
@@ -0,0 +1,233 @@
+"""Flask (app.py) ve ASGI (asgi.py) sürümlerinin paylaştığı doğrulama ve sözleşme yardımcıları.
+
+Buradaki fonksiyonlar çerçeveden bağımsızdır: sorgu parametreleri `args`
+olarak `.get()` destekleyen herhangi bir eşleme (Flask `request.args`,
+Starlette `request.query_params`) ile verilir, Mongo'ya erişilmez. Böylece
+iki sürüm aynı girdiye aynı hata mesajını ve aynı sorguyu üretir.
+"""
+import hashlib
+from collections import Counter
+
+from bson import ObjectId
+
+# Liste uç noktaları için sayfalama ayarları
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+# /project_tasks/batch her proje için en fazla bu kadar görev döner; sayılar yine tüm görevleri kapsar
+BATCH_TASKS_PER_PROJECT = MAX_PAGE_SIZE
+
+TASK_FIELDS = ["_id", "header", "details", "status", "owner", "project_id"]
+PROJECT_FIELDS = ["_id", "project_name", "description", "status"]
+INTERN_FIELDS = ["email", "name", "surname", "school", "department"]
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 50
+AUDIT_FIELDS = ["_id", "type", "object_id", "actor", "at", "owner", "previous_owner", "project_id", "data"]
+PROJECT_STATS_FIELDS = ["project_id", "counts", "total"]
+OWNER_STATS_FIELDS = ["owner", "counts", "total"]
+
+TASK_REQUIRED_FIELDS = ["header", "details", "status", "project_id", "owner"]
+TASK_UPDATE_FIELDS = ["header", "details", "status", "owner", "project_id"]
+TASK_MOVE_FIELDS = ["status", "owner", "project_id"]
+
+
+USER_ROLES = ['admin', 'intern']
+USER_PROFILE_FIELDS = ["email", "name", "surname", "phone", "school", "department", "role"]
+PROFILE_UPDATE_FIELDS = ["name", "surname", "phone", "school", "department", "gender", "birthdate"]
+PROJECT_REQUIRED_FIELDS = ["project_name", "description", "status"]
+
+
+def build_user(data):
+    """Kayıt verisini doğrular; şifre hash'lenmeden (kullanıcı belgesi, hata mesajı) döner."""
+    if not all(data.get(field) for field in ["email", "password", "name", "surname", "role"]):
+        return None, "Email, password, name, surname, and role are required"
+    if data.get('role') not in USER_ROLES:
+        return None, "Role must be either 'admin' or 'intern'"
+    user = {field: data.get(field) for field in USER_PROFILE_FIELDS}
+    user["profile_picture"] = None  # Initialize profile_picture as None
+    return user, None
+
+
+def build_project(data):
+    if not all(data.get(field) for field in PROJECT_REQUIRED_FIELDS):
+        return None, "Project name, description, and status are required"
+    return {field: data.get(field) for field in PROJECT_REQUIRED_FIELDS}, None
+
+
+def build_task(data):
+    """Yeni görev belgesi üretir; eksik alan varsa (None, hata mesajı) döner."""
+    if not all(data.get(field) for field in TASK_REQUIRED_FIELDS):
+        return None, "Header, details, status, project_id, and owner are required"
+    task = {field: data.get(field) for field in TASK_REQUIRED_FIELDS}
+    task["_id"] = str(ObjectId())
+    return task, None
+
+
+def task_update_fields(data):
+    """UpdateTask tüm alanları birlikte yazar; gönderilmeyenler None olur."""
+    return {field: data.get(field) for field in TASK_UPDATE_FIELDS}
+
+
+def profile_update_fields(form):
+    """PUT /profile formundaki alanlar; gönderilmeyenler None olur."""
+    return {field: form.get(field) for field in PROFILE_UPDATE_FIELDS}
+
+
+def parse_page_args(args, allowed_fields, id_type=str, default_fields=None):
+    """?limit=&after=&fields= parametrelerini okur, hatalı girdide ValueError fırlatır."""
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    after = args.get('after')
+    if after and id_type is ObjectId:
+        if not ObjectId.is_valid(after):
+            raise ValueError("Invalid cursor")
+        after = ObjectId(after)
+
+    fields = args.get('fields')
+    if fields:
+        requested = [field.strip() for field in fields.split(',') if field.strip()]
+        unknown = [field for field in requested if field not in allowed_fields]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    else:
+        requested = default_fields or allowed_fields
+
+    projection = {field: 1 for field in requested}
+    return limit, after or None, projection
+
+
+def page_query(query, projection, after):
+    """Keyset sayfalama sorgusu: (sorgu, projeksiyon, _id yanıttan çıkarılacak mı)."""
+    # İmleç için _id her zaman okunur, istenmediyse yanıttan çıkarılır
+    drop_id = "_id" not in projection
+    projection = dict(projection, _id=1)
+    if after is not None:
+        query = {"$and": [query, {"_id": {"$gt": after}}]}
+    return query, projection, drop_id
+
+
+def page_result(docs, limit, drop_id):
+    """limit + 1 belgeyle okunan sayfayı (belgeler, next_cursor) biçimine getirir."""
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = str(docs[-1]["_id"])
+
+    for doc in docs:
+        if drop_id:
+            del doc["_id"]
+        else:
+            doc["_id"] = str(doc["_id"])
+    return docs, next_cursor
+
+
+def task_filters(args):
+    query = {}
+    if args.get('status'):
+        query["status"] = args.get('status')
+    if args.get('owner'):
+        query["owner"] = args.get('owner')
+    return query
+
+
+def parse_search_args(args, allowed_types):
+    """/search parametreleri: (metin, limit, türler); hatalı girdide ValueError."""
+    text = (args.get('q') or '').strip()
+    if not text:
+        raise ValueError("q is required")
+    try:
+        limit = min(int(args.get('limit', DEFAULT_SEARCH_LIMIT)), MAX_SEARCH_LIMIT)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+
+    kinds = [kind.strip() for kind in (args.get('type') or '').split(',') if kind.strip()]
+    unknown = [kind for kind in kinds if kind not in allowed_types]
+    if unknown:
+        raise ValueError(f"Unknown types: {', '.join(unknown)}")
+    return text, limit, kinds
+
+
+def batch_project_ids(data):
+    """/project_tasks/batch gövdesini doğrular: (project_ids, hata mesajı)."""
+    if not isinstance(data, dict):
+        return None, "Request body must be a JSON object"
+    project_ids = data.get('project_ids')
+    if not isinstance(project_ids, list) or not project_ids:
+        return None, "project_ids must be a non-empty list"
+    if len(project_ids) > MAX_PAGE_SIZE:
+        return None, f"At most {MAX_PAGE_SIZE} project_ids are allowed"
+    if not all(isinstance(project_id, str) and project_id for project_id in project_ids):
+        return None, "project_ids must be non-empty strings"
+    return project_ids, None
+
+
+def batch_tasks_pipeline(project_ids):
+    # Tüm projelerin görevleri tek bir aggregation ile, proje bazında gruplanarak gelir.
+    # Grup başına dönen görevler kesilir (tek büyük proje 16MB belge sınırını aşmasın);
+    # durumlar ayrıca toplandığı için sayılar eksiksizdir
+    return [
+        {"$match": {"project_id": {"$in": project_ids}}},
+        {"$sort": {"_id": 1}},
+        {"$project": {field: 1 for field in TASK_FIELDS}},
+        {"$group": {"_id": "$project_id", "tasks": {"$push": "$$ROOT"}, "statuses": {"$push": "$status"}}},
+        {"$project": {"tasks": {"$slice": ["$tasks", BATCH_TASKS_PER_PROJECT]}, "statuses": 1}}
+    ]
+
+
+def batch_tasks_result(project_ids, groups):
+    result = {project_id: {"tasks": [], "counts": {}, "truncated": False} for project_id in project_ids}
+    for group in groups:
+        tasks = group["tasks"]
+        for task in tasks:
+            task["_id"] = str(task["_id"])
+        statuses = group.get("statuses", [])
+        result[group["_id"]] = {
+            "tasks": tasks,
+            "counts": dict(Counter(statuses)),
+            "truncated": len(statuses) > len(tasks)
+        }
+    return result
+
+
+# /dashboard'un içeriği bu koleksiyonlardan okunur; ETag'i bunların revizyonlarından türetilir
+DASHBOARD_COLLECTIONS = ('tasks', 'projects', 'users')
+
+
+def dashboard_queries(email, role):
+    """/dashboard'un okuduğu sorgular: (görev sorgusu, görev, proje ve dizin projeksiyonları)."""
+    task_query = {"owner": email} if role == 'intern' else {}
+    return (task_query,
+            {field: 1 for field in TASK_FIELDS},
+            {field: 1 for field in PROJECT_FIELDS},
+            # /interns ve /get_user_names aynı alanları okuyor; tek sayfa ikisini de besler
+            {"email": 1, "name": 1, "surname": 1, "role": 1})
+
+
+def dashboard_payload(role, profile, tasks_page, projects_page, directory_page):
+    """Dizin de diğer listeler gibi tek sayfadır; devamı /get_user_names ve /interns'ten
+    directory_next_cursor ile çekilir (kullanıcılar _id sırasında olduğu için aynı imleç ikisinde de geçerli)."""
+    directory, directory_cursor = directory_page
+    interns = []
+    if role == 'admin':
+        interns = [{"email": u["email"], "name": u.get("name"), "surname": u.get("surname")}
+                   for u in directory if u.get("role") == "intern"]
+    return {
+        "profile": profile,
+        "tasks": {"items": tasks_page[0], "next_cursor": tasks_page[1]},
+        "projects": {"items": projects_page[0], "next_cursor": projects_page[1]},
+        "interns": interns,
+        "user_names": {u["email"]: f"{u.get('name')} {u.get('surname')}" for u in directory},
+        "directory_next_cursor": directory_cursor
+    }
+
+
+def dashboard_etag(email, role, versions):
+    """Sorgular çalışmadan hesaplanır: kullanıcı, rol ve DASHBOARD_COLLECTIONS revizyonları aynıysa içerik de aynıdır."""
+    return hashlib.sha1(f"dashboard|{email}|{role}|{tuple(versions)}".encode('utf-8')).hexdigest()
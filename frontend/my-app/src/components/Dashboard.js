@@ -3,6 +3,8 @@ import axios from 'axios';
 import { Container, Typography, Box, Table, TableBody, TableCell, TableContainer, TableRow, Paper, Button, TextField, FormControl, InputLabel, Select, MenuItem } from '@mui/material';
 import { DragDropContext, Droppable, Draggable } from 'react-beautiful-dnd';
 import { useNavigate } from 'react-router-dom';
+import { fetchAllPages } from './pagination';
+import { subscribeToEvents, upsertById, removeById } from './events';
 import './css/Dashboard.css';
 
 const Dashboard = () => {
@@ -19,91 +21,79 @@ const Dashboard = () => {
     const navigate = useNavigate();
 
     useEffect(() => {
-        const fetchProfile = async () => {
-            const token = localStorage.getItem('token');
-            if (!token) {
-                navigate('/login');
-                return;
-            }
+        let unsubscribe = () => {};
 
-            try {
-                const response = await axios.get('http://localhost:5000/profile', {
-                    headers: { Authorization: `Bearer ${token}` }
-                });
-                setUser(response.data);
-                if (response.data.role === 'admin') {
-                    fetchInterns(token);
-                }
-            } catch (error) {
-                console.error(error);
-                alert('Failed to fetch profile data.');
-                navigate('/login');
-            }
-        };
-
-        const fetchTasks = async () => {
+        // Profil, görevler, projeler ve kullanıcı dizini tek istekte gelir
+        const fetchDashboard = async () => {
             const token = localStorage.getItem('token');
             if (!token) {
                 navigate('/login');
                 return;
             }
 
+            const config = { headers: { Authorization: `Bearer ${token}` } };
+            let data;
             try {
-                const response = await axios.get('http://localhost:5000/tasks', {
-                    headers: { Authorization: `Bearer ${token}` }
-                });
-                setTasks(response.data);
+                const response = await axios.get('http://localhost:5000/dashboard', config);
+                data = response.data;
             } catch (error) {
                 console.error(error);
-                alert('Failed to fetch tasks.');
-            }
-        };
-
-        const fetchProjects = async () => {
-            const token = localStorage.getItem('token');
-            if (!token) {
+                alert('Failed to fetch dashboard data.');
                 navigate('/login');
                 return;
             }
 
-            try {
-                const response = await axios.get('http://localhost:5000/get_projects', {
-                    headers: { Authorization: `Bearer ${token}` }
-                });
-                setProjects(response.data);
-            } catch (error) {
-                console.error(error);
-                alert('Failed to fetch projects.');
-            }
-        };
+            setUser(data.profile);
+            subscribe(data.profile);
+            setInterns(data.interns);
+            setUserNames(data.user_names);
+            setTasks(data.tasks.items);
+            setProjects(data.projects.items);
 
-        const fetchInterns = async (token) => {
+            // İlk sayfadan fazlası varsa kalan sayfaları liste uç noktalarından çek
             try {
-                const response = await axios.get('http://localhost:5000/interns', {
-                    headers: { Authorization: `Bearer ${token}` }
-                });
-                setInterns(response.data);
+                if (data.tasks.next_cursor) {
+                    const rest = await fetchAllPages('http://localhost:5000/tasks', config, { after: data.tasks.next_cursor });
+                    setTasks((prevTasks) => [...prevTasks, ...rest]);
+                }
+                if (data.projects.next_cursor) {
+                    const rest = await fetchAllPages('http://localhost:5000/get_projects', config, { after: data.projects.next_cursor });
+                    setProjects((prevProjects) => [...prevProjects, ...rest]);
+                }
+                if (data.directory_next_cursor) {
+                    const names = await fetchAllPages('http://localhost:5000/get_user_names', config, { after: data.directory_next_cursor });
+                    setUserNames((prevNames) => ({ ...prevNames, ...names }));
+                    if (data.profile.role === 'admin') {
+                        const rest = await fetchAllPages('http://localhost:5000/interns', config, { after: data.directory_next_cursor });
+                        setInterns((prevInterns) => [...prevInterns, ...rest]);
+                    }
+                }
             } catch (error) {
-                console.error('Failed to fetch interns:', error);
+                console.error(error);
+                alert('Failed to fetch tasks.');
             }
         };
 
-        const fetchUserNames = async () => {
-            const token = localStorage.getItem('token');
-            try {
-                const response = await axios.get('http://localhost:5000/get_user_names', {
-                    headers: { Authorization: `Bearer ${token}` }
-                });
-                setUserNames(response.data);
-            } catch (error) {
-                console.error('Failed to fetch user names:', error);
-            }
+        // Listeler yeniden çekilmez; sunucudan gelen değişiklikler yerel duruma uygulanır
+        const subscribe = (profile) => {
+            unsubscribe();
+            const isVisible = (task) => profile.role === 'admin' || task.owner === profile.email;
+            const applyTask = (event) => {
+                setTasks((prevTasks) => (isVisible(event.data) ? upsertById(prevTasks, event.data) : removeById(prevTasks, event.id)));
+            };
+            unsubscribe = subscribeToEvents({
+                'task.created': applyTask,
+                'task.updated': applyTask,
+                'task.deleted': (event) => setTasks((prevTasks) => removeById(prevTasks, event.id)),
+                'project.created': (event) => setProjects((prevProjects) => upsertById(prevProjects, event.data)),
+                'project.updated': (event) => setProjects((prevProjects) => upsertById(prevProjects, event.data)),
+                'project.deleted': (event) => setProjects((prevProjects) => removeById(prevProjects, event.id)),
+                'resync': () => fetchDashboard(),
+            });
         };
 
-        fetchProfile();
-        fetchTasks();
-        fetchProjects();
-        fetchUserNames();
+        fetchDashboard();
+        return () => unsubscribe();
     }, [navigate]);
 
     const handleDragEnd = (result) => {
@@ -144,7 +134,7 @@ const Dashboard = () => {
             console.log('Response:', response);
 
             if (response.status === 201) {
-                setTasks([...tasks, { ...newTaskObj, _id: response.data.task_id }]);
+                setTasks((prevTasks) => upsertById(prevTasks, { ...newTaskObj, _id: response.data.task_id }));
                 setNewTaskHeader('');
                 setNewTaskDetails('');
                 setSelectedProject('');
@@ -41,7 +41,7 @@ const ProfilePage = () => {
     return <div className="loading">Loading...</div>;
   }
 
-  const profilePictureUrl = user.profile_picture ? `data:image/jpeg;base64,${btoa(user.profile_picture)}` : defaultProfilePicture;
+  const profilePictureUrl = user.profile_picture || defaultProfilePicture;
 
   return (
     <div className="profile-page">
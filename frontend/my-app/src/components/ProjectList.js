@@ -6,6 +6,8 @@ import EditIcon from '@mui/icons-material/Edit';
 import { useNavigate } from 'react-router-dom';
 import ExpandLess from '@mui/icons-material/ExpandLess';
 import ExpandMore from '@mui/icons-material/ExpandMore';
+import { fetchPage, fetchAllPages } from './pagination';
+import { subscribeToEvents, upsertById, removeById } from './events';
 
 function ProjectList({ onEdit }) {
   const [projects, setProjects] = useState([]);
@@ -14,6 +16,7 @@ function ProjectList({ onEdit }) {
   const [open, setOpen] = useState({});
   const [isAdmin, setIsAdmin] = useState(false);
   const [userEmail, setUserEmail] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
 
   const navigate = useNavigate();
 
@@ -35,37 +38,75 @@ function ProjectList({ onEdit }) {
     fetchUserRole();
     fetchProjects();
     fetchUserNames();
+
+    // Görev ve proje değişiklikleri listeyi yeniden çekmeden uygulanır
+    const removeTask = (prevTasks, taskId) => {
+      const updated = {};
+      for (const [projectId, projectTasks] of Object.entries(prevTasks)) {
+        updated[projectId] = removeById(projectTasks, taskId);
+      }
+      return updated;
+    };
+    const applyTask = (event) => {
+      setTasks((prevTasks) => {
+        const updated = removeTask(prevTasks, event.id);
+        const projectId = event.data.project_id;
+        if (updated[projectId]) {
+          updated[projectId] = upsertById(updated[projectId], event.data);
+        }
+        return updated;
+      });
+    };
+    return subscribeToEvents({
+      'task.created': applyTask,
+      'task.updated': applyTask,
+      'task.deleted': (event) => setTasks((prevTasks) => removeTask(prevTasks, event.id)),
+      'project.created': (event) => {
+        setProjects((prevProjects) => upsertById(prevProjects, event.data));
+        setTasks((prevTasks) => ({ [event.id]: [], ...prevTasks }));
+      },
+      'project.updated': (event) => setProjects((prevProjects) => upsertById(prevProjects, event.data)),
+      'project.deleted': (event) => setProjects((prevProjects) => removeById(prevProjects, event.id)),
+      'resync': () => fetchProjects(),
+    });
   }, []);
 
-  const fetchProjects = async () => {
+  // after verilirse sonraki sayfa mevcut listeye eklenir, verilmezse liste baştan yüklenir
+  const fetchProjects = async (after) => {
     try {
       const token = localStorage.getItem('token');
       const config = {
         headers: { Authorization: `Bearer ${token}` }
       };
-      const response = await axios.get('http://localhost:5000/get_projects', config);
-      setProjects(response.data);
-      fetchTasksForProjects(response.data);
+      const page = await fetchPage('http://localhost:5000/get_projects', config, after ? { after } : {});
+      setProjects((prevProjects) => (after ? [...prevProjects, ...page.items] : page.items));
+      setNextCursor(page.next_cursor);
+      fetchTasksForProjects(page.items, Boolean(after));
     } catch (error) {
       console.error('Error fetching projects:', error);
     }
   };
 
-  const fetchTasksForProjects = async (projects) => {
+  // Sayfadaki tüm projelerin görevleri tek istekte gelir
+  const fetchTasksForProjects = async (projects, append) => {
     const tasks = {};
-    for (const project of projects) {
+    if (projects.length > 0) {
       try {
         const token = localStorage.getItem('token');
         const config = {
           headers: { Authorization: `Bearer ${token}` }
         };
-        const response = await axios.get(`http://localhost:5000/get_project_tasks/${project._id}`, config);
-        tasks[project._id] = response.data;
+        const response = await axios.post('http://localhost:5000/project_tasks/batch', {
+          project_ids: projects.map((project) => project._id)
+        }, config);
+        for (const [projectId, group] of Object.entries(response.data)) {
+          tasks[projectId] = group.tasks;
+        }
       } catch (error) {
-        console.error(`Error fetching tasks for project ${project._id}:`, error);
+        console.error('Error fetching tasks for projects:', error);
       }
     }
-    setTasks(tasks);
+    setTasks((prevTasks) => (append ? { ...prevTasks, ...tasks } : tasks));
   };
 
   const fetchUserNames = async () => {
@@ -74,8 +115,8 @@ function ProjectList({ onEdit }) {
       const config = {
         headers: { Authorization: `Bearer ${token}` }
       };
-      const response = await axios.get('http://localhost:5000/get_user_names', config);
-      setUserNames(response.data);
+      const userNames = await fetchAllPages('http://localhost:5000/get_user_names', config);
+      setUserNames(userNames);
     } catch (error) {
       console.error('Error fetching user names:', error);
     }
@@ -88,7 +129,7 @@ function ProjectList({ onEdit }) {
         headers: { Authorization: `Bearer ${token}` }
       };
       await axios.delete(`http://localhost:5000/delete_project/${projectId}`, config);
-      fetchProjects();
+      setProjects((prevProjects) => removeById(prevProjects, projectId));
     } catch (error) {
       console.error('Error deleting project:', error);
     }
@@ -101,7 +142,13 @@ function ProjectList({ onEdit }) {
         headers: { Authorization: `Bearer ${token}` }
       };
       await axios.delete(`http://localhost:5000/delete_task/${taskId}`, config);
-      fetchProjects();
+      setTasks((prevTasks) => {
+        const updated = {};
+        for (const [projectId, projectTasks] of Object.entries(prevTasks)) {
+          updated[projectId] = removeById(projectTasks, taskId);
+        }
+        return updated;
+      });
     } catch (error) {
       console.error('Error deleting task:', error);
     }
@@ -189,6 +236,15 @@ function ProjectList({ onEdit }) {
             </div>
           ))}
         </List>
+        {nextCursor && (
+          <Button
+            variant="outlined"
+            onClick={() => fetchProjects(nextCursor)}
+            sx={{ mb: 2 }}
+          >
+            Load More Projects
+          </Button>
+        )}
         {isAdmin && (
           <Button
             variant="contained"
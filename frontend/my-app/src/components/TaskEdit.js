@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import axios from 'axios';
 import { TextField, Button, Container, Box, Typography, Alert, FormControl, InputLabel, Select, MenuItem } from '@mui/material';
 import { useNavigate, useParams } from 'react-router-dom';
+import { fetchAllPages } from './pagination';
 
 function TaskEdit() {
     const [taskData, setTaskData] = useState({
@@ -54,8 +55,8 @@ function TaskEdit() {
                 headers: { Authorization: `Bearer ${token}` }
             };
             try {
-                const response = await axios.get('http://localhost:5000/interns', config);
-                setInterns(response.data);
+                const items = await fetchAllPages('http://localhost:5000/interns', config);
+                setInterns(items);
             } catch (error) {
                 console.error('Error fetching interns:', error);
             }
@@ -0,0 +1,35 @@
+// /events SSE akışına abone olur; handlers olay tipine göre çağrılır ({ 'task.updated': fn, ... }).
+// EventSource başlık gönderemediği için token sorgu dizesinde gider. Açık bağlantılar thread tutmasın diye
+// REACT_APP_EVENTS_URL ile ASGI sürümüne (ör. http://localhost:5001) yönlendirilebilir.
+const EVENTS_URL = process.env.REACT_APP_EVENTS_URL || 'http://localhost:5000';
+const EVENT_TYPES = [
+    'task.created', 'task.updated', 'task.deleted',
+    'project.created', 'project.updated', 'project.deleted',
+    'resync',
+];
+
+export const subscribeToEvents = (handlers) => {
+    const token = localStorage.getItem('token');
+    const source = new EventSource(`${EVENTS_URL}/events?token=${encodeURIComponent(token)}`);
+    EVENT_TYPES.forEach((type) => {
+        source.addEventListener(type, (e) => {
+            if (handlers[type]) {
+                handlers[type](JSON.parse(e.data));
+            }
+        });
+    });
+    return () => source.close();
+};
+
+// Listede aynı _id'li öğeyi günceller, yoksa sona ekler
+export const upsertById = (items, item) => {
+    const index = items.findIndex((existing) => existing._id === item._id);
+    if (index === -1) {
+        return [...items, item];
+    }
+    const updated = [...items];
+    updated[index] = { ...updated[index], ...item };
+    return updated;
+};
+
+export const removeById = (items, id) => items.filter((item) => item._id !== id);
@@ -0,0 +1,24 @@
+import axios from 'axios';
+
+// Sayfalı liste uç noktalarından ({ items, next_cursor }) tek bir sayfa çeker
+export const fetchPage = async (url, config, params = {}) => {
+    const response = await axios.get(url, { ...config, params: { ...config.params, ...params } });
+    return response.data;
+};
+
+// next_cursor bitene kadar tüm sayfaları çeker; items dizi veya nesne olabilir.
+// params.after verilirse o imleçten devam eder.
+export const fetchAllPages = async (url, config, params = {}) => {
+    let { after, ...rest } = params;
+    let result = null;
+    do {
+        const page = await fetchPage(url, config, after ? { ...rest, after } : rest);
+        if (Array.isArray(page.items)) {
+            result = (result || []).concat(page.items);
+        } else {
+            result = { ...(result || {}), ...page.items };
+        }
+        after = page.next_cursor;
+    } while (after);
+    return result;
+};